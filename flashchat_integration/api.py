@@ -1,447 +1,717 @@
-
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-import frappe
-import requests
-import json
-import hmac
-import hashlib
-import base64
-from frappe import _
-from frappe.utils import now, add_to_date, cint, flt
-from datetime import datetime, timedelta
-
-@frappe.whitelist()
-def send_sms_api(phone, message, reference_doctype=None, reference_name=None):
-    """Send SMS via FlashChat API"""
-    try:
-        api = FlashChatAPI()
-        result = api.send_sms(
-            phone=phone,
-            message=message,
-            reference_doctype=reference_doctype,
-            reference_name=reference_name
-        )
-        return result
-    except Exception as e:
-        frappe.log_error(f"SMS API Error: {str(e)}", "FlashChat SMS API")
-        return {"success": False, "error": str(e)}
-
-@frappe.whitelist()
-def send_whatsapp_api(account, recipient, message, reference_doctype=None, reference_name=None):
-    """Send WhatsApp message via FlashChat API"""
-    try:
-        api = FlashChatAPI()
-        result = api.send_whatsapp(
-            account=account,
-            recipient=recipient,
-            message=message,
-            reference_doctype=reference_doctype,
-            reference_name=reference_name
-        )
-        return result
-    except Exception as e:
-        frappe.log_error(f"WhatsApp API Error: {str(e)}", "FlashChat WhatsApp API")
-        return {"success": False, "error": str(e)}
-
-@frappe.whitelist()
-def send_otp_api(phone, expire=300, reference_doctype=None, reference_name=None):
-    """Send OTP via FlashChat API"""
-    try:
-        api = FlashChatAPI()
-        result = api.send_otp(
-            phone=phone,
-            expire=expire,
-            reference_doctype=reference_doctype,
-            reference_name=reference_name
-        )
-        return result
-    except Exception as e:
-        frappe.log_error(f"OTP API Error: {str(e)}", "FlashChat OTP API")
-        return {"success": False, "error": str(e)}
-
-@frappe.whitelist()
-def verify_otp_api(code):
-    """Verify OTP code"""
-    try:
-        api = FlashChatAPI()
-        result = api.verify_otp(code)
-        return result
-    except Exception as e:
-        frappe.log_error(f"OTP Verify Error: {str(e)}", "FlashChat OTP Verify")
-        return {"success": False, "error": str(e)}
-
-@frappe.whitelist()
-def get_whatsapp_accounts_api():
-    """Get WhatsApp accounts"""
-    try:
-        api = FlashChatAPI()
-        result = api.get_whatsapp_accounts()
-        return result
-    except Exception as e:
-        frappe.log_error(f"WhatsApp Accounts Error: {str(e)}", "FlashChat WhatsApp Accounts")
-        return {"success": False, "error": str(e)}
-
-@frappe.whitelist(allow_guest=True)
-def flashchat_webhook():
-    """Handle FlashChat webhooks"""
-    try:
-        settings = frappe.get_single("FlashChat Settings")
-        
-        if not settings.enable_webhooks:
-            frappe.throw(_("Webhooks are disabled"))
-        
-        # Get request data
-        data = frappe.request.get_data()
-        headers = frappe.request.headers
-        
-        # Verify webhook signature if secret is configured
-        if settings.webhook_secret:
-            signature = headers.get("X-Frappe-Webhook-Signature")
-            if not verify_webhook_signature(data, signature, settings.webhook_secret):
-                frappe.throw(_("Invalid webhook signature"))
-        
-        # Parse webhook data
-        webhook_data = json.loads(data)
-        event_type = webhook_data.get("event")
-        
-        if event_type == "message_status_update":
-            handle_message_status_update(webhook_data)
-        elif event_type == "message_received":
-            handle_message_received(webhook_data)
-        elif event_type == "campaign_update":
-            handle_campaign_update(webhook_data)
-        elif event_type == "device_status":
-            handle_device_status(webhook_data)
-        
-        return {"success": True}
-        
-    except Exception as e:
-        frappe.log_error(f"Webhook Error: {str(e)}", "FlashChat Webhook")
-        return {"success": False, "error": str(e)}
-
-def verify_webhook_signature(data, signature, secret):
-    """Verify webhook signature"""
-    if not signature:
-        return False
-    
-    expected_signature = base64.b64encode(
-        hmac.new(
-            secret.encode('utf-8'),
-            data,
-            hashlib.sha256
-        ).digest()
-    ).decode('utf-8')
-    
-    return hmac.compare_digest(signature, expected_signature)
-
-def handle_message_status_update(data):
-    """Handle message status update webhook"""
-    message_id = data.get("message_id")
-    status = data.get("status")
-    
-    if message_id:
-        # Update message log status
-        message_log = frappe.db.get_value(
-            "FlashChat Message Log",
-            {"flashchat_message_id": message_id},
-            "name"
-        )
-        
-        if message_log:
-            frappe.db.set_value("FlashChat Message Log", message_log, "status", status)
-            frappe.db.commit()
-
-def handle_message_received(data):
-    """Handle incoming message webhook"""
-    # Log incoming message
-    message_log = frappe.get_doc({
-        "doctype": "FlashChat Message Log",
-        "message_type": "Incoming",
-        "phone_number": data.get("from"),
-        "message_content": data.get("message"),
-        "flashchat_message_id": data.get("message_id"),
-        "status": "Received",
-        "received_at": now()
-    })
-    message_log.insert(ignore_permissions=True)
-
-def handle_campaign_update(data):
-    """Handle campaign update webhook"""
-    campaign_id = data.get("campaign_id")
-    status = data.get("status")
-    
-    # Update campaign status if exists
-    campaign = frappe.db.get_value(
-        "FlashChat Campaign",
-        {"flashchat_campaign_id": campaign_id},
-        "name"
-    )
-    
-    if campaign:
-        frappe.db.set_value("FlashChat Campaign", campaign, "status", status)
-        frappe.db.commit()
-
-def handle_device_status(data):
-    """Handle device status webhook"""
-    # Log device status change
-    frappe.log_error(
-        f"Device Status Update: {json.dumps(data)}",
-        "FlashChat Device Status"
-    )
-
-class FlashChatAPI:
-    """FlashChat API wrapper class"""
-    
-    def __init__(self):
-        self.settings = frappe.get_single("FlashChat Settings")
-        self.base_url = self.settings.base_url.rstrip('/')
-        self.api_secret = self.settings.get_password("api_secret")
-        
-        if not self.api_secret:
-            frappe.throw(_("FlashChat API Secret not configured"))
-    
-    def _make_request(self, endpoint, method="POST", data=None, params=None):
-        """Make HTTP request to FlashChat API"""
-        url = f"{self.base_url}/{endpoint.lstrip('/')}"
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_secret}",
-            "Content-Type": "application/json"
-        }
-        
-        try:
-            if method == "GET":
-                response = requests.get(url, headers=headers, params=params, timeout=30)
-            else:
-                response = requests.post(url, headers=headers, json=data, timeout=30)
-            
-            response.raise_for_status()
-            return response.json()
-            
-        except requests.exceptions.RequestException as e:
-            frappe.log_error(f"FlashChat API Error: {str(e)}", "FlashChat API Request")
-            raise frappe.ValidationError(f"FlashChat API Error: {str(e)}")
-    
-    def send_sms(self, phone, message, reference_doctype=None, reference_name=None):
-        """Send SMS message"""
-        # Check rate limits
-        if not self._check_rate_limit("SMS"):
-            frappe.throw(_("SMS rate limit exceeded"))
-        
-        # Format phone number
-        phone = self._format_phone_number(phone)
-        
-        data = {
-            "phone": phone,
-            "message": message,
-            "sim": self.settings.default_sim or 1,
-            "mode": self.settings.sms_mode or "devices"
-        }
-        
-        try:
-            response = self._make_request("send-sms", data=data)
-            
-            # Log message
-            self._log_message(
-                message_type="SMS",
-                phone_number=phone,
-                message_content=message,
-                flashchat_message_id=response.get("message_id"),
-                status="Sent",
-                reference_doctype=reference_doctype,
-                reference_name=reference_name,
-                response_content=json.dumps(response)
-            )
-            
-            return {
-                "success": True,
-                "message_id": response.get("message_id"),
-                "response": response
-            }
-            
-        except Exception as e:
-            # Log failed message
-            self._log_message(
-                message_type="SMS",
-                phone_number=phone,
-                message_content=message,
-                status="Failed",
-                reference_doctype=reference_doctype,
-                reference_name=reference_name,
-                error_message=str(e)
-            )
-            raise
-    
-    def send_whatsapp(self, account, recipient, message, reference_doctype=None, reference_name=None):
-        """Send WhatsApp message"""
-        # Check rate limits
-        if not self._check_rate_limit("WhatsApp"):
-            frappe.throw(_("WhatsApp rate limit exceeded"))
-        
-        # Format phone number
-        recipient = self._format_phone_number(recipient)
-        
-        data = {
-            "account": account,
-            "recipient": recipient,
-            "message": message
-        }
-        
-        try:
-            response = self._make_request("send-whatsapp", data=data)
-            
-            # Log message
-            self._log_message(
-                message_type="WhatsApp",
-                phone_number=recipient,
-                message_content=message,
-                flashchat_message_id=response.get("message_id"),
-                status="Sent",
-                reference_doctype=reference_doctype,
-                reference_name=reference_name,
-                response_content=json.dumps(response)
-            )
-            
-            return {
-                "success": True,
-                "message_id": response.get("message_id"),
-                "response": response
-            }
-            
-        except Exception as e:
-            # Log failed message
-            self._log_message(
-                message_type="WhatsApp",
-                phone_number=recipient,
-                message_content=message,
-                status="Failed",
-                reference_doctype=reference_doctype,
-                reference_name=reference_name,
-                error_message=str(e)
-            )
-            raise
-    
-    def send_otp(self, phone, expire=300, reference_doctype=None, reference_name=None):
-        """Send OTP"""
-        # Check rate limits
-        if not self._check_rate_limit("OTP"):
-            frappe.throw(_("OTP rate limit exceeded"))
-        
-        # Format phone number
-        phone = self._format_phone_number(phone)
-        
-        data = {
-            "phone": phone,
-            "expire": expire
-        }
-        
-        try:
-            response = self._make_request("send-otp", data=data)
-            
-            # Log OTP
-            self._log_message(
-                message_type="OTP",
-                phone_number=phone,
-                message_content=f"OTP sent with {expire}s expiry",
-                flashchat_message_id=response.get("otp_id"),
-                status="Sent",
-                reference_doctype=reference_doctype,
-                reference_name=reference_name,
-                response_content=json.dumps(response)
-            )
-            
-            return {
-                "success": True,
-                "otp_id": response.get("otp_id"),
-                "response": response
-            }
-            
-        except Exception as e:
-            # Log failed OTP
-            self._log_message(
-                message_type="OTP",
-                phone_number=phone,
-                message_content=f"OTP failed with {expire}s expiry",
-                status="Failed",
-                reference_doctype=reference_doctype,
-                reference_name=reference_name,
-                error_message=str(e)
-            )
-            raise
-    
-    def verify_otp(self, code):
-        """Verify OTP code"""
-        data = {"code": code}
-        
-        try:
-            response = self._make_request("verify-otp", data=data)
-            return {
-                "success": True,
-                "valid": response.get("valid", False),
-                "response": response
-            }
-        except Exception as e:
-            return {"success": False, "error": str(e)}
-    
-    def get_whatsapp_accounts(self):
-        """Get WhatsApp accounts"""
-        try:
-            response = self._make_request("whatsapp-accounts", method="GET")
-            return {
-                "success": True,
-                "accounts": response.get("accounts", [])
-            }
-        except Exception as e:
-            return {"success": False, "error": str(e)}
-    
-    def _format_phone_number(self, phone):
-        """Format phone number to international format"""
-        if not phone:
-            return phone
-        
-        # Remove any non-digit characters except +
-        phone = ''.join(c for c in phone if c.isdigit() or c == '+')
-        
-        # Add + if not present
-        if not phone.startswith('+'):
-            phone = '+' + phone
-        
-        return phone
-    
-    def _check_rate_limit(self, message_type):
-        """Check if rate limit is exceeded"""
-        now_time = datetime.now()
-        hour_ago = now_time - timedelta(hours=1)
-        
-        # Get rate limit from settings
-        if message_type == "SMS":
-            limit = self.settings.sms_rate_limit or 100
-        elif message_type == "WhatsApp":
-            limit = self.settings.whatsapp_rate_limit or 50
-        elif message_type == "OTP":
-            limit = self.settings.otp_rate_limit or 20
-        else:
-            return True
-        
-        # Count messages sent in last hour
-        count = frappe.db.count(
-            "FlashChat Message Log",
-            {
-                "message_type": message_type,
-                "sent_at": [">=", hour_ago.strftime("%Y-%m-%d %H:%M:%S")],
-                "status": ["in", ["Sent", "Delivered"]]
-            }
-        )
-        
-        return count < limit
-    
-    def _log_message(self, **kwargs):
-        """Log message to FlashChat Message Log"""
-        message_log = frappe.get_doc({
-            "doctype": "FlashChat Message Log",
-            "sent_at": now(),
-            **kwargs
-        })
-        message_log.insert(ignore_permissions=True)
-        frappe.db.commit()
+
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+import requests
+import sys
+import json
+import hmac
+import hashlib
+import base64
+from frappe import _
+from frappe.utils import now, add_to_date, cint, flt
+from datetime import datetime, timedelta
+from flashchat_integration.bulk import bulk_insert
+from flashchat_integration.daily_stats import record_change
+from flashchat_integration.doctype.flashchat_settings.flashchat_settings import get_settings
+from flashchat_integration.log_buffer import configure_buffers, is_buffered, message_log_buffer
+from flashchat_integration.rate_limiter import get_message_limiter
+from flashchat_integration.transport import get_transport, get_pool_stats
+from flashchat_integration.whatsapp_accounts import report_sends, select_accounts
+
+# Most messages one batch API call may send; larger sends go through campaigns
+MAX_BATCH_MESSAGES = 1000
+
+@frappe.whitelist()
+def send_sms_api(phone, message, reference_doctype=None, reference_name=None):
+    """Send SMS via FlashChat API"""
+    try:
+        api = FlashChatAPI()
+        result = api.send_sms(
+            phone=phone,
+            message=message,
+            reference_doctype=reference_doctype,
+            reference_name=reference_name
+        )
+        return result
+    except Exception as e:
+        frappe.log_error(f"SMS API Error: {str(e)}", "FlashChat SMS API")
+        return {"success": False, "error": str(e)}
+
+@frappe.whitelist()
+def send_whatsapp_api(account, recipient, message, reference_doctype=None, reference_name=None):
+    """Send WhatsApp message via FlashChat API"""
+    try:
+        api = FlashChatAPI()
+        result = api.send_whatsapp(
+            account=account,
+            recipient=recipient,
+            message=message,
+            reference_doctype=reference_doctype,
+            reference_name=reference_name
+        )
+        return result
+    except Exception as e:
+        frappe.log_error(f"WhatsApp API Error: {str(e)}", "FlashChat WhatsApp API")
+        return {"success": False, "error": str(e)}
+
+@frappe.whitelist()
+def send_otp_api(phone, expire=300, reference_doctype=None, reference_name=None):
+    """Send OTP via FlashChat API"""
+    try:
+        api = FlashChatAPI()
+        result = api.send_otp(
+            phone=phone,
+            expire=expire,
+            reference_doctype=reference_doctype,
+            reference_name=reference_name
+        )
+        return result
+    except Exception as e:
+        frappe.log_error(f"OTP API Error: {str(e)}", "FlashChat OTP API")
+        return {"success": False, "error": str(e)}
+
+@frappe.whitelist()
+def send_sms_batch_api(messages):
+    """Send a batch of SMS messages via FlashChat API"""
+    messages = _validate_batch(messages)
+    
+    try:
+        api = FlashChatAPI()
+        results = api.send_sms_batch(messages)
+        return {
+            "success": True,
+            "sent": sum(1 for r in results if r["success"]),
+            "failed": sum(1 for r in results if not r["success"]),
+            "results": results
+        }
+    except Exception as e:
+        frappe.log_error(f"SMS Batch API Error: {str(e)}", "FlashChat SMS Batch API")
+        return {"success": False, "error": str(e)}
+
+@frappe.whitelist()
+def send_whatsapp_batch_api(messages, account=None):
+    """Send a batch of WhatsApp messages via FlashChat API"""
+    messages = _validate_batch(messages)
+    
+    try:
+        api = FlashChatAPI()
+        results = api.send_whatsapp_batch(account, messages)
+        return {
+            "success": True,
+            "sent": sum(1 for r in results if r["success"]),
+            "failed": sum(1 for r in results if not r["success"]),
+            "results": results
+        }
+    except Exception as e:
+        frappe.log_error(f"WhatsApp Batch API Error: {str(e)}", "FlashChat WhatsApp Batch API")
+        return {"success": False, "error": str(e)}
+
+def _validate_batch(messages):
+    # Batch sends bypass the per-message rate limits, so only managers may use them, in bounded batches
+    frappe.only_for(["System Manager", "FlashChat Manager"])
+    frappe.has_permission("FlashChat Message Log", "create", throw=True)
+    
+    if isinstance(messages, str):
+        messages = json.loads(messages)
+    
+    if not isinstance(messages, list):
+        frappe.throw("Messages must be a list")
+    if len(messages) > MAX_BATCH_MESSAGES:
+        frappe.throw(f"A batch can send at most {MAX_BATCH_MESSAGES} messages")
+    
+    return messages
+
+@frappe.whitelist()
+def verify_otp_api(code):
+    """Verify OTP code"""
+    try:
+        api = FlashChatAPI()
+        result = api.verify_otp(code)
+        return result
+    except Exception as e:
+        frappe.log_error(f"OTP Verify Error: {str(e)}", "FlashChat OTP Verify")
+        return {"success": False, "error": str(e)}
+
+@frappe.whitelist()
+def get_whatsapp_accounts_api():
+    """Get WhatsApp accounts"""
+    try:
+        api = FlashChatAPI()
+        result = api.get_whatsapp_accounts()
+        return result
+    except Exception as e:
+        frappe.log_error(f"WhatsApp Accounts Error: {str(e)}", "FlashChat WhatsApp Accounts")
+        return {"success": False, "error": str(e)}
+
+@frappe.whitelist()
+def get_pool_stats_api():
+    """Get HTTP connection pool statistics for this worker"""
+    frappe.only_for("System Manager")
+    return {"success": True, "pools": get_pool_stats()}
+
+@frappe.whitelist(allow_guest=True)
+def flashchat_webhook():
+    """Handle FlashChat webhooks"""
+    try:
+        settings = get_settings()
+        
+        if not settings.enable_webhooks:
+            frappe.throw(_("Webhooks are disabled"))
+        
+        # Get request data
+        data = frappe.request.get_data()
+        headers = frappe.request.headers
+        
+        # Verify webhook signature if secret is configured
+        if settings.webhook_secret:
+            signature = headers.get("X-Frappe-Webhook-Signature")
+            if not verify_webhook_signature(data, signature, settings.webhook_secret):
+                frappe.throw(_("Invalid webhook signature"))
+        
+        # Parse webhook data
+        webhook_data = json.loads(data)
+        event_type = webhook_data.get("event")
+        
+        if event_type == "message_status_update":
+            handle_message_status_update(webhook_data)
+        elif event_type == "message_received":
+            handle_message_received(webhook_data)
+        elif event_type == "campaign_update":
+            handle_campaign_update(webhook_data)
+        elif event_type == "device_status":
+            handle_device_status(webhook_data)
+        
+        return {"success": True}
+        
+    except Exception as e:
+        frappe.log_error(f"Webhook Error: {str(e)}", "FlashChat Webhook")
+        return {"success": False, "error": str(e)}
+
+def verify_webhook_signature(data, signature, secret):
+    """Verify webhook signature"""
+    if not signature:
+        return False
+    
+    expected_signature = base64.b64encode(
+        hmac.new(
+            secret.encode('utf-8'),
+            data,
+            hashlib.sha256
+        ).digest()
+    ).decode('utf-8')
+    
+    return hmac.compare_digest(signature, expected_signature)
+
+def handle_message_status_update(data):
+    """Handle message status update webhook"""
+    message_id = data.get("message_id")
+    status = data.get("status")
+    
+    if message_id:
+        # Update message log status
+        message_log = frappe.db.get_value(
+            "FlashChat Message Log",
+            {"flashchat_message_id": message_id},
+            ["name", "status", "sent_at", "message_type"],
+            as_dict=True
+        )
+        
+        if message_log:
+            frappe.db.set_value("FlashChat Message Log", message_log.name, "status", status)
+            record_change("FlashChat Message Log", message_log, {**message_log, "status": status})
+            frappe.db.commit()
+
+def handle_message_received(data):
+    """Handle incoming message webhook"""
+    # Log incoming message
+    message_log = frappe.get_doc({
+        "doctype": "FlashChat Message Log",
+        "message_type": "Incoming",
+        "phone_number": data.get("from"),
+        "message_content": data.get("message"),
+        "flashchat_message_id": data.get("message_id"),
+        "status": "Received",
+        "received_at": now()
+    })
+    message_log.insert(ignore_permissions=True)
+
+def handle_campaign_update(data):
+    """Handle campaign update webhook"""
+    campaign_id = data.get("campaign_id")
+    status = data.get("status")
+    
+    # Update campaign status if exists
+    campaign = frappe.db.get_value(
+        "FlashChat Campaign",
+        {"flashchat_campaign_id": campaign_id},
+        "name"
+    )
+    
+    if campaign:
+        frappe.db.set_value("FlashChat Campaign", campaign, "status", status)
+        frappe.db.commit()
+
+def handle_device_status(data):
+    """Handle device status webhook"""
+    # Log device status change
+    frappe.log_error(
+        f"Device Status Update: {json.dumps(data)}",
+        "FlashChat Device Status"
+    )
+
+def format_phone_number(phone):
+    """Format phone number to international format"""
+    if not phone:
+        return phone
+    
+    # Remove any non-digit characters except +
+    phone = ''.join(c for c in phone if c.isdigit() or c == '+')
+    
+    # Add + if not present
+    if not phone.startswith('+'):
+        phone = '+' + phone
+    
+    return phone
+
+class FlashChatAPI:
+    """FlashChat API wrapper class"""
+    
+    def __init__(self):
+        self.settings = get_settings()
+        self.base_url = self.settings.base_url.rstrip('/')
+        self.api_secret = self.settings.api_secret
+        
+        if not self.api_secret:
+            frappe.throw(_("FlashChat API Secret not configured"))
+        
+        self.transport = get_transport(self.settings)
+        configure_buffers(self.settings)
+    
+    def _make_request(self, endpoint, method="POST", data=None, params=None, log_errors=True):
+        """Make HTTP request to FlashChat API"""
+        url = f"{self.base_url}/{endpoint.lstrip('/')}"
+        
+        headers = {
+            "Authorization": f"Bearer {self.api_secret}",
+            "Content-Type": "application/json"
+        }
+        
+        try:
+            if method == "GET":
+                response = self.transport.request("GET", url, headers=headers, params=params)
+            else:
+                response = self.transport.request("POST", url, headers=headers, json=data)
+            
+            response.raise_for_status()
+            return response.json()
+            
+        except requests.exceptions.RequestException as e:
+            if log_errors:
+                frappe.log_error(f"FlashChat API Error: {str(e)}", "FlashChat API Request")
+            raise frappe.ValidationError(f"FlashChat API Error: {str(e)}")
+    
+    def send_sms(self, phone, message, reference_doctype=None, reference_name=None):
+        """Send SMS message"""
+        # Check rate limits
+        if not self._check_rate_limit("SMS"):
+            frappe.throw(_("SMS rate limit exceeded"))
+        
+        # Format phone number
+        phone = self._format_phone_number(phone)
+        
+        data = {
+            "phone": phone,
+            "message": message,
+            "sim": self.settings.default_sim or 1,
+            "mode": self.settings.sms_mode or "devices"
+        }
+        
+        try:
+            response = self._make_request("send-sms", data=data)
+            
+            # Log message
+            self._log_message(
+                message_type="SMS",
+                phone_number=phone,
+                message_content=message,
+                flashchat_message_id=response.get("message_id"),
+                status="Sent",
+                reference_doctype=reference_doctype,
+                reference_name=reference_name,
+                response_content=json.dumps(response)
+            )
+            
+            return {
+                "success": True,
+                "message_id": response.get("message_id"),
+                "response": response
+            }
+            
+        except Exception as e:
+            self._release_rate_limit("SMS", 1)
+            
+            # Log failed message
+            self._log_message(
+                message_type="SMS",
+                phone_number=phone,
+                message_content=message,
+                status="Failed",
+                reference_doctype=reference_doctype,
+                reference_name=reference_name,
+                error_message=str(e)
+            )
+            raise
+    
+    def send_whatsapp(self, account, recipient, message, reference_doctype=None, reference_name=None):
+        """Send WhatsApp message"""
+        # Check rate limits
+        if not self._check_rate_limit("WhatsApp"):
+            frappe.throw(_("WhatsApp rate limit exceeded"))
+        
+        # Format phone number
+        recipient = self._format_phone_number(recipient)
+        
+        data = {
+            "account": account,
+            "recipient": recipient,
+            "message": message
+        }
+        
+        try:
+            response = self._make_request("send-whatsapp", data=data)
+            report_sends(account, succeeded=1)
+            
+            # Log message
+            self._log_message(
+                message_type="WhatsApp",
+                phone_number=recipient,
+                message_content=message,
+                flashchat_message_id=response.get("message_id"),
+                status="Sent",
+                reference_doctype=reference_doctype,
+                reference_name=reference_name,
+                response_content=json.dumps(response)
+            )
+            
+            return {
+                "success": True,
+                "message_id": response.get("message_id"),
+                "response": response
+            }
+            
+        except Exception as e:
+            self._release_rate_limit("WhatsApp", 1)
+            report_sends(account, failed=1)
+            
+            # Log failed message
+            self._log_message(
+                message_type="WhatsApp",
+                phone_number=recipient,
+                message_content=message,
+                status="Failed",
+                reference_doctype=reference_doctype,
+                reference_name=reference_name,
+                error_message=str(e)
+            )
+            raise
+    
+    def send_otp(self, phone, expire=300, reference_doctype=None, reference_name=None):
+        """Send OTP"""
+        # Check rate limits
+        if not self._check_rate_limit("OTP"):
+            frappe.throw(_("OTP rate limit exceeded"))
+        
+        # Format phone number
+        phone = self._format_phone_number(phone)
+        
+        data = {
+            "phone": phone,
+            "expire": expire
+        }
+        
+        try:
+            response = self._make_request("send-otp", data=data)
+            
+            # Log OTP
+            self._log_message(
+                message_type="OTP",
+                phone_number=phone,
+                message_content=f"OTP sent with {expire}s expiry",
+                flashchat_message_id=response.get("otp_id"),
+                status="Sent",
+                reference_doctype=reference_doctype,
+                reference_name=reference_name,
+                response_content=json.dumps(response)
+            )
+            
+            return {
+                "success": True,
+                "otp_id": response.get("otp_id"),
+                "response": response
+            }
+            
+        except Exception as e:
+            self._release_rate_limit("OTP", 1)
+            
+            # Log failed OTP
+            self._log_message(
+                message_type="OTP",
+                phone_number=phone,
+                message_content=f"OTP failed with {expire}s expiry",
+                status="Failed",
+                reference_doctype=reference_doctype,
+                reference_name=reference_name,
+                error_message=str(e)
+            )
+            raise
+    
+    def send_sms_batch(self, items, concurrency=None):
+        """Send many SMS messages with bounded concurrency
+        
+        `items` is a list of (phone, message[, reference_doctype, reference_name])
+        tuples or dicts with the same keys. Returns one result dict per item, in order.
+        """
+        return self._send_batch("SMS", items, concurrency=concurrency)
+    
+    def send_whatsapp_batch(self, account, items, concurrency=None):
+        """Send many WhatsApp messages with bounded concurrency
+        
+        Without an `account` the messages are spread round-robin across the
+        healthy WhatsApp accounts.
+        """
+        return self._send_batch("WhatsApp", items, account=account, concurrency=concurrency)
+    
+    def send_otp_batch(self, items, expire=300, concurrency=None):
+        """Send OTPs to many (phone[, reference_doctype, reference_name]) items"""
+        items = [
+            item if isinstance(item, dict) else dict(zip(("phone", "reference_doctype", "reference_name"), item))
+            for item in (items or [])
+        ]
+        return self._send_batch("OTP", items, expire=expire, concurrency=concurrency)
+    
+    def _send_batch(self, message_type, items, account=None, expire=300, concurrency=None):
+        """Validate, rate limit and hand a batch of messages to the send engine"""
+        from flashchat_integration.send_engine import FlashChatSendEngine, SendJob
+        
+        results, sendable = self._prepare_batch(items, require_message=message_type != "OTP")
+        
+        # Reserve rate limit tokens for the whole batch in one atomic step
+        allowed = self._reserve_rate_limit(message_type, len(sendable))
+        for item in sendable[allowed:]:
+            results[item["idx"]]["error"] = f"{message_type} rate limit exceeded"
+            results[item["idx"]]["rate_limited"] = True
+        sendable = sendable[:allowed]
+        
+        if message_type == "WhatsApp":
+            accounts = [account] * len(sendable) if account else select_accounts(len(sendable), self)
+            if sendable and not accounts:
+                for item in sendable:
+                    results[item["idx"]]["error"] = "No WhatsApp accounts available"
+                self._release_rate_limit(message_type, len(sendable))
+                return results
+        else:
+            accounts = [None] * len(sendable)
+        
+        jobs = [
+            SendJob(
+                message_type,
+                item["phone"],
+                message=item["message"],
+                account=job_account,
+                expire=expire,
+                reference_doctype=item["reference_doctype"],
+                reference_name=item["reference_name"]
+            )
+            for item, job_account in zip(sendable, accounts)
+        ]
+        
+        engine = FlashChatSendEngine(self, concurrency=concurrency)
+        sent_results = engine.run(jobs)
+        for item, result in zip(sendable, sent_results):
+            results[item["idx"]] = result
+        
+        self._release_rate_limit(message_type, sum(1 for r in sent_results if not r["success"]))
+        
+        if message_type == "WhatsApp":
+            self._report_account_sends(jobs, sent_results)
+        
+        return results
+    
+    def _report_account_sends(self, jobs, sent_results):
+        """Record per-account outcomes of a WhatsApp batch"""
+        outcomes = {}
+        for job, result in zip(jobs, sent_results):
+            counts = outcomes.setdefault(job.account, [0, 0])
+            counts[0 if result["success"] else 1] += 1
+        
+        for account, (succeeded, failed) in outcomes.items():
+            report_sends(account, succeeded=succeeded, failed=failed)
+    
+    def _prepare_batch(self, items, require_message=True):
+        """Normalize batch items in one pass, returning per-item results and sendable items"""
+        results = []
+        sendable = []
+        
+        for idx, item in enumerate(items or []):
+            if isinstance(item, dict):
+                phone = item.get("phone") or item.get("recipient")
+                message = item.get("message")
+                reference_doctype = item.get("reference_doctype")
+                reference_name = item.get("reference_name")
+            else:
+                item = list(item) + [None] * (4 - len(item))
+                phone, message, reference_doctype, reference_name = item[:4]
+            
+            phone = self._format_phone_number(str(phone)) if phone else phone
+            result = {
+                "phone": phone,
+                "success": False,
+                "error": None,
+                "reference_doctype": reference_doctype,
+                "reference_name": reference_name
+            }
+            results.append(result)
+            
+            if not phone or not any(c.isdigit() for c in phone):
+                result["error"] = "Invalid phone number"
+            elif require_message and not message:
+                result["error"] = "Message is empty"
+            else:
+                sendable.append({
+                    "idx": idx,
+                    "phone": phone,
+                    "message": message,
+                    "reference_doctype": reference_doctype,
+                    "reference_name": reference_name
+                })
+        
+        return results, sendable
+    
+    def verify_otp(self, code):
+        """Verify OTP code"""
+        data = {"code": code}
+        
+        try:
+            response = self._make_request("verify-otp", data=data)
+            return {
+                "success": True,
+                "valid": response.get("valid", False),
+                "response": response
+            }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def get_whatsapp_accounts(self):
+        """Get WhatsApp accounts"""
+        try:
+            response = self._make_request("whatsapp-accounts", method="GET")
+            return {
+                "success": True,
+                "accounts": response.get("accounts", [])
+            }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    
+    def _format_phone_number(self, phone):
+        """Format phone number to international format"""
+        return format_phone_number(phone)
+    
+    def _check_rate_limit(self, message_type):
+        """Reserve one send against the rate limit, returning False if it is exceeded"""
+        return self._reserve_rate_limit(message_type, 1) == 1
+    
+    def _reserve_rate_limit(self, message_type, count):
+        """Atomically reserve up to `count` sends, returning how many were granted"""
+        limiter = get_message_limiter(self.settings, message_type)
+        if not limiter:
+            return count
+        
+        try:
+            granted, wait = limiter.reserve(count, partial=True)
+            return granted
+        except Exception as e:
+            frappe.log_error(f"Rate limiter unavailable: {str(e)}", "FlashChat Rate Limit")
+            return min(count, self._count_rate_limit_capacity(message_type))
+    
+    def _release_rate_limit(self, message_type, count):
+        """Give back reserved sends that failed"""
+        limiter = get_message_limiter(self.settings, message_type)
+        if not limiter or count <= 0:
+            return
+        
+        try:
+            limiter.release(count)
+        except Exception:
+            pass
+    
+    def get_rate_limit_wait(self, message_type, count=1):
+        """Get the seconds until `count` more messages of this type may be sent"""
+        limiter = get_message_limiter(self.settings, message_type)
+        if not limiter:
+            return 0
+        
+        try:
+            return limiter.wait_time(count)
+        except Exception as e:
+            frappe.log_error(f"Rate limiter unavailable: {str(e)}", "FlashChat Rate Limit")
+            return 60
+    
+    def _get_rate_limit_capacity(self, message_type):
+        """Get how many more messages of this type may be sent right now"""
+        limiter = get_message_limiter(self.settings, message_type)
+        if not limiter:
+            return sys.maxsize
+        
+        try:
+            return limiter.available()
+        except Exception as e:
+            frappe.log_error(f"Rate limiter unavailable: {str(e)}", "FlashChat Rate Limit")
+            return self._count_rate_limit_capacity(message_type)
+    
+    def _count_rate_limit_capacity(self, message_type):
+        """Count sends in the last hour from the message log, used when Redis is unavailable"""
+        now_time = datetime.now()
+        hour_ago = now_time - timedelta(hours=1)
+        
+        limiter = get_message_limiter(self.settings, message_type)
+        if not limiter:
+            return sys.maxsize
+        
+        # Count messages sent in last hour
+        count = frappe.db.count(
+            "FlashChat Message Log",
+            {
+                "message_type": message_type,
+                "sent_at": [">=", hour_ago.strftime("%Y-%m-%d %H:%M:%S")],
+                "status": ["in", ["Sent", "Delivered"]]
+            }
+        )
+        
+        return max(limiter.capacity - count, 0)
+    
+    def _log_message(self, **kwargs):
+        """Log message to FlashChat Message Log"""
+        if is_buffered(self.settings):
+            message_log_buffer.add({"sent_at": now(), "retry_count": 0, **kwargs})
+            return
+        
+        message_log = frappe.get_doc({
+            "doctype": "FlashChat Message Log",
+            "sent_at": now(),
+            **kwargs
+        })
+        message_log.insert(ignore_permissions=True)
+        frappe.db.commit()
+    
+    def _log_messages(self, rows):
+        """Log many messages to FlashChat Message Log with multi-row inserts"""
+        if not rows:
+            return
+        
+        if is_buffered(self.settings):
+            message_log_buffer.extend(rows)
+            return
+        
+        bulk_insert("FlashChat Message Log", rows, "FCM-.YYYY.-.#####")
+        frappe.db.commit()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import time
+
+import frappe
+from frappe.utils.background_jobs import is_job_enqueued
+
+from flashchat_integration.export import get_high_water_mark
+from flashchat_integration.retention import BATCH_PAUSE_SECONDS, DELETE_BATCH_SIZE, MAX_RUN_SECONDS
+
+LIVE_DOCTYPE = "FlashChat Message Log"
+
+# Plain table with the live table's columns and indexes; not a DocType
+ARCHIVE_DOCTYPE = "FlashChat Message Log Archive"
+
+DEFAULT_ARCHIVE_DAYS = 30
+
+def start_archive(cutoff):
+    """Run archive_before, unless an earlier archive run is still queued or running"""
+    if is_archive_enqueued():
+        return None
+    return archive_before(cutoff)
+
+def archive_before(cutoff, batch_size=DELETE_BATCH_SIZE, pause=BATCH_PAUSE_SECONDS, max_seconds=MAX_RUN_SECONDS, run=0):
+    """Move message logs sent before `cutoff` from the live table to the archive, one batch at a time
+    
+    Each batch is copied and deleted in one transaction, so a row is always in
+    exactly one of the two tables. Rows the backup export has not written yet
+    stay in the live table, since the export only reads that table. Like
+    retention purges, a run that stops is resumed by running it again and long
+    runs queue a continuation job.
+    """
+    ensure_archive_table()
+    exported = get_high_water_mark(LIVE_DOCTYPE)
+    columns = ", ".join(f"`{column}`" for column in _get_columns(LIVE_DOCTYPE))
+    
+    started = time.monotonic()
+    archived = 0
+    complete = False
+    
+    while time.monotonic() - started < max_seconds:
+        names = frappe.db.sql_list(f"""
+            select name from `tab{LIVE_DOCTYPE}`
+            where sent_at < %(cutoff)s
+                and (modified < %(exported)s or (modified = %(exported)s and name <= %(exported_name)s))
+            order by sent_at
+            limit %(limit)s
+        """, {
+            "cutoff": cutoff,
+            "exported": exported["modified"],
+            "exported_name": exported["name"],
+            "limit": batch_size
+        })
+        
+        if names:
+            values = {"names": tuple(names)}
+            frappe.db.sql(f"""
+                insert ignore into `tab{ARCHIVE_DOCTYPE}` ({columns})
+                select {columns} from `tab{LIVE_DOCTYPE}` where name in %(names)s
+            """, values)
+            frappe.db.sql(f"delete from `tab{LIVE_DOCTYPE}` where name in %(names)s", values)
+            frappe.db.commit()
+            archived += len(names)
+        
+        if len(names) < batch_size:
+            complete = True
+            break
+        
+        time.sleep(pause)
+    
+    summary = {
+        "cutoff": str(cutoff),
+        "archived": archived,
+        "seconds": round(time.monotonic() - started, 1),
+        "complete": complete
+    }
+    frappe.logger("flashchat_integration").info(f"Message log archive: {summary}")
+    
+    if not complete:
+        # Alternates between two job ids, like retention purges, so it is not taken for a duplicate of itself
+        frappe.enqueue(
+            "flashchat_integration.archive.archive_before",
+            queue="long",
+            job_id=get_archive_job_id(run + 1),
+            deduplicate=True,
+            cutoff=cutoff,
+            batch_size=batch_size,
+            pause=pause,
+            max_seconds=max_seconds,
+            run=run + 1
+        )
+    
+    return summary
+
+def is_archive_enqueued():
+    return any(is_job_enqueued(get_archive_job_id(run)) for run in (0, 1))
+
+def get_archive_job_id(run=0):
+    return f"flashchat_archive:{run % 2}"
+
+def ensure_archive_table():
+    """Create the archive table, or add columns the live table gained since it was created"""
+    if not archive_exists():
+        frappe.db.sql_ddl(f"create table if not exists `tab{ARCHIVE_DOCTYPE}` like `tab{LIVE_DOCTYPE}`")
+        return
+    
+    archived = _get_columns(ARCHIVE_DOCTYPE)
+    for column, column_type in _get_columns(LIVE_DOCTYPE).items():
+        if column not in archived:
+            frappe.db.sql_ddl(f"alter table `tab{ARCHIVE_DOCTYPE}` add column `{column}` {column_type}")
+
+def archive_exists():
+    return bool(frappe.db.sql("show tables like %s", f"tab{ARCHIVE_DOCTYPE}"))
+
+def get_message_logs(filters=None, fields=None, order_by="sent_at desc", limit=None, include_archive=False,
+        ignore_permissions=True):
+    """Get message logs from the live table, and from the archive too when `include_archive` is set
+    
+    Takes the same filters as frappe.get_all. With the archive, both tables
+    are read with the same query and the rows merged in `order_by` order.
+    Without `ignore_permissions`, both are read through frappe.get_list, so
+    the session user's permissions and user permissions apply to each.
+    """
+    fields = fields or ["name", "message_type", "phone_number", "status", "sent_at", "message_content"]
+    get_list = frappe.get_all if ignore_permissions else frappe.get_list
+    rows = get_list(LIVE_DOCTYPE, filters=filters, fields=fields, order_by=order_by, limit_page_length=limit or 0)
+    
+    if not include_archive or not archive_exists():
+        return rows
+    
+    rows += _query_archive(get_list, filters=filters, fields=fields, order_by=order_by, limit_page_length=limit or 0)
+    
+    field, direction = (order_by.split() + ["asc"])[:2]
+    rows.sort(key=lambda row: (row.get(field) is not None, row.get(field)), reverse=direction.lower() == "desc")
+    return rows[:limit] if limit else rows
+
+def count_message_logs(filters=None, include_archive=False):
+    """Count message logs in the live table, and in the archive too when `include_archive` is set"""
+    count = frappe.db.count(LIVE_DOCTYPE, filters)
+    
+    if include_archive and archive_exists():
+        archived = _query_archive(frappe.get_all, filters=filters, fields=["count(*) as count"], order_by=None)
+        count += archived[0].count if archived else 0
+    
+    return count
+
+def _query_archive(get_list, **kwargs):
+    # Build the query get_list would run on the live table, permission conditions included,
+    # and run it on the archive instead
+    query = get_list(LIVE_DOCTYPE, run=0, **kwargs)
+    return frappe.db.sql(query.replace(f"`tab{LIVE_DOCTYPE}`", f"`tab{ARCHIVE_DOCTYPE}`"), as_dict=True)
+
+def _get_columns(doctype):
+    return {row[0]: row[1] for row in frappe.db.sql(f"show columns from `tab{doctype}`")}
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import hashlib
+import json
+
+import frappe
+from frappe.utils import cint, now
+
+AUDIENCE_DOCTYPE = "FlashChat Audience Member"
+
+# Source doctype -> {member field: source field}
+AUDIENCE_SOURCES = {
+    "Contact": {
+        "mobile_no": "mobile_no",
+        "first_name": "first_name",
+        "last_name": "last_name"
+    },
+    "Customer": {
+        "mobile_no": "mobile_no",
+        "customer_name": "customer_name",
+        "customer_group": "customer_group",
+        "territory": "territory"
+    },
+    "Lead": {
+        "mobile_no": "mobile_no",
+        "lead_name": "lead_name",
+        "lead_source": "source",
+        "territory": "territory"
+    }
+}
+
+# Campaign target audience -> source doctype
+TARGET_AUDIENCES = {
+    "All Contacts": "Contact",
+    "Customers": "Customer",
+    "Leads": "Lead"
+}
+
+MEMBER_FIELDS = ["mobile_no", "first_name", "last_name", "customer_name", "lead_name", "customer_group", "territory", "lead_source"]
+
+# Source rows read per query when rebuilding the member table
+REBUILD_PAGE_SIZE = 1000
+
+# Custom Filter audiences are read from Contact directly
+CUSTOM_FILTER_FIELDS = ["name", "mobile_no", "first_name", "last_name"]
+
+# Operators a Custom Filter condition may use
+FILTER_OPERATORS = ["=", "!=", ">", ">=", "<", "<=", "like", "not like", "in", "not in", "is", "between"]
+
+# How long an audience count is reused
+COUNT_CACHE_TTL = 600
+
+# A full table scan estimated to read more rows than this is reported to the user
+FULL_SCAN_WARNING_ROWS = 100000
+
+def sync_member(doc):
+    """Bring the audience member row of a Contact, Customer or Lead up to date"""
+    if doc.doctype not in AUDIENCE_SOURCES:
+        return
+    
+    if not doc.get("mobile_no"):
+        remove_member(doc.doctype, doc.name)
+        return
+    
+    _upsert_members([_member_row(doc.doctype, doc.name, doc)])
+
+def remove_member(source_doctype, source_name):
+    """Drop a Contact, Customer or Lead from the campaign audiences"""
+    frappe.db.delete(AUDIENCE_DOCTYPE, {"source_doctype": source_doctype, "source_name": source_name})
+
+def rebuild_audience(page_size=REBUILD_PAGE_SIZE):
+    """Bring every member row up to date with its source, a page at a time
+    
+    Repairs anything the document hooks missed, such as rows changed by
+    imports or direct SQL. Commits after every page.
+    """
+    for doctype, fields in AUDIENCE_SOURCES.items():
+        source_fields = ["name"] + sorted(set(fields.values()))
+        after = None
+        
+        while True:
+            filters = [["mobile_no", "!=", ""]]
+            if after:
+                filters.append(["name", ">", after])
+            
+            page = frappe.get_all(
+                doctype,
+                filters=filters,
+                fields=source_fields,
+                order_by="name asc",
+                limit_page_length=page_size
+            )
+            if not page:
+                break
+            
+            _upsert_members([_member_row(doctype, row.name, row) for row in page])
+            frappe.db.commit()
+            
+            if len(page) < page_size:
+                break
+            after = page[-1].name
+        
+        # Drop members whose source was deleted or lost its number
+        frappe.db.sql(f"""
+            delete member from `tab{AUDIENCE_DOCTYPE}` member
+            left join `tab{doctype}` source on source.name = member.source_name
+            where member.source_doctype = %s and (source.name is null or coalesce(source.mobile_no, '') = '')
+        """, doctype)
+        frappe.db.commit()
+
+def get_audience_query(campaign):
+    """Get the doctype, filters and fields to read a campaign's target audience
+    
+    Returns (None, None, None) for an unknown audience.
+    """
+    if campaign.target_audience == "Custom Filter":
+        return "Contact", compile_custom_filters(campaign.contact_filters), CUSTOM_FILTER_FIELDS
+    
+    source_doctype = TARGET_AUDIENCES.get(campaign.target_audience)
+    if not source_doctype:
+        return None, None, None
+    
+    filters = {"source_doctype": source_doctype}
+    if source_doctype == "Customer" and campaign.customer_group:
+        filters["customer_group"] = campaign.customer_group
+    if source_doctype == "Lead" and campaign.lead_source:
+        filters["lead_source"] = campaign.lead_source
+    if source_doctype in ["Customer", "Lead"] and campaign.territory:
+        filters["territory"] = campaign.territory
+    
+    fields = ["name", "source_name"] + list(AUDIENCE_SOURCES[source_doctype])
+    return AUDIENCE_DOCTYPE, filters, fields
+
+def compile_custom_filters(contact_filters):
+    """Validate Custom Filter JSON against Contact and return it as list filters
+    
+    Accepts an object of {field: value} or {field: [operator, value]}, or a
+    list of [field, operator, value] conditions. Only Contact columns and known
+    operators are allowed, so the filters always compile to one plain query.
+    """
+    filters = contact_filters
+    if isinstance(filters, str):
+        try:
+            filters = json.loads(filters) if filters.strip() else None
+        except ValueError:
+            frappe.throw("Contact Filters must be valid JSON")
+    
+    if isinstance(filters, dict):
+        conditions = [
+            [field] + list(value) if isinstance(value, (list, tuple)) else [field, "=", value]
+            for field, value in filters.items()
+        ]
+    elif isinstance(filters, list):
+        conditions = [list(condition) if isinstance(condition, (list, tuple)) else condition for condition in filters]
+    elif not filters:
+        conditions = []
+    else:
+        frappe.throw("Contact Filters must be an object or a list of conditions")
+    
+    columns = frappe.get_meta("Contact").get_valid_columns()
+    compiled = []
+    
+    for condition in conditions:
+        if isinstance(condition, list) and len(condition) == 4 and condition[0] == "Contact":
+            condition = condition[1:]
+        
+        if not isinstance(condition, list) or len(condition) != 3:
+            frappe.throw(f"Invalid Contact Filters condition: {condition}")
+        
+        field, operator, value = condition
+        operator = str(operator).lower()
+        
+        if field not in columns:
+            frappe.throw(f"Contact has no field {field}")
+        if operator not in FILTER_OPERATORS:
+            frappe.throw(f"Operator {operator} is not allowed in Contact Filters")
+        
+        compiled.append([field, operator, value])
+    
+    compiled.append(["mobile_no", "!=", ""])
+    return compiled
+
+def count_audience(campaign, cached=True):
+    """Count a campaign's target audience, reusing a recent count of the same filters"""
+    doctype, filters, fields = get_audience_query(campaign)
+    if not doctype:
+        return 0
+    
+    key = _count_key(doctype, filters)
+    if cached:
+        count = frappe.cache().get_value(key)
+        if count is not None:
+            return count
+    
+    count = frappe.db.count(doctype, filters)
+    frappe.cache().set_value(key, count, expires_in_sec=COUNT_CACHE_TTL)
+    return count
+
+def get_full_scans(campaign):
+    """EXPLAIN the audience query and return plan rows that scan a large table end to end"""
+    doctype, filters, fields = get_audience_query(campaign)
+    if not doctype:
+        return []
+    
+    query = frappe.get_all(doctype, filters=filters, fields=["name"], order_by="name asc", run=0)
+    plan = frappe.db.sql(f"explain {query}", as_dict=True)
+    
+    return [
+        row for row in plan
+        if (row.get("type") or "").upper() == "ALL" and cint(row.get("rows")) > FULL_SCAN_WARNING_ROWS
+    ]
+
+def get_audience_preview(campaign, limit=10):
+    """Get the audience count, the first few recipients and any full table scans"""
+    doctype, filters, fields = get_audience_query(campaign)
+    if not doctype:
+        return {"count": 0, "sample": [], "full_scans": []}
+    
+    return {
+        "count": count_audience(campaign),
+        "sample": frappe.get_all(doctype, filters=filters, fields=fields, order_by="name asc", limit_page_length=limit),
+        "full_scans": get_full_scans(campaign)
+    }
+
+def _member_row(source_doctype, source_name, source):
+    row = {"source_doctype": source_doctype, "source_name": source_name}
+    for member_field, source_field in AUDIENCE_SOURCES[source_doctype].items():
+        row[member_field] = source.get(source_field)
+    return row
+
+def _upsert_members(rows):
+    # One statement for the whole page, keyed on the unique (source_doctype, source_name) index
+    if not rows:
+        return
+    
+    timestamp = now()
+    columns = ["name", "owner", "modified_by", "creation", "modified", "docstatus", "idx",
+        "source_doctype", "source_name"] + MEMBER_FIELDS
+    
+    values = []
+    for row in rows:
+        values.extend([frappe.generate_hash(length=10), "Administrator", "Administrator", timestamp, timestamp, 0, 0])
+        values.extend(row.get(column) for column in columns[7:])
+    
+    column_names = ", ".join(f"`{column}`" for column in columns)
+    placeholders = ", ".join(["({})".format(", ".join(["%s"] * len(columns)))] * len(rows))
+    updates = ", ".join(f"`{column}` = values(`{column}`)" for column in ["modified"] + MEMBER_FIELDS)
+    
+    frappe.db.sql(f"""
+        insert into `tab{AUDIENCE_DOCTYPE}` ({column_names})
+        values {placeholders}
+        on duplicate key update {updates}
+    """, values)
+
+def _count_key(doctype, filters):
+    digest = hashlib.md5(json.dumps([doctype, filters], sort_keys=True, default=str).encode()).hexdigest()
+    return f"flashchat_audience_count:{digest}"
@@ -1,9 +1,9 @@
-
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-import frappe
-
-def validate_otp_login(login_manager):
-    """Validate OTP-based login"""
-    # TODO: Implement OTP validation for login
-    pass
+
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+
+def validate_otp_login(login_manager):
+    """Validate OTP-based login"""
+    # TODO: Implement OTP validation for login
+    pass
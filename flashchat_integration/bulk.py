@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+from frappe.model.naming import parse_naming_series
+from frappe.utils import cint, now
+
+from flashchat_integration.daily_stats import record_logs
+
+def make_names(naming_series, count):
+    """Reserve `count` consecutive names from a naming series with a single series update"""
+    if count <= 0:
+        return []
+    
+    prefix, digits = naming_series.rsplit(".", 1)
+    prefix = parse_naming_series(prefix + ".")
+    digits = len(digits)
+    
+    # Creates the series row or advances it in one statement, so first callers cannot race;
+    # the row stays locked until commit, so reading it back gives this caller's range
+    frappe.db.sql(
+        "insert into `tabSeries` (`name`, `current`) values (%s, %s) "
+        "on duplicate key update `current` = coalesce(`current`, 0) + %s",
+        (prefix, count, count)
+    )
+    start = cint(frappe.db.sql("select `current` from `tabSeries` where `name`=%s", prefix)[0][0]) - count
+    
+    return [f"{prefix}{str(start + i).zfill(digits)}" for i in range(1, count + 1)]
+
+def bulk_insert(doctype, rows, naming_series, chunk_size=1000):
+    """Insert plain row dicts as documents with multi-row INSERTs
+    
+    Skips controller hooks, so callers must pass rows that are already valid.
+    Returns the generated names in row order.
+    """
+    if not rows:
+        return []
+    
+    timestamp = now()
+    user = frappe.session.user if getattr(frappe.local, "session", None) else "Administrator"
+    names = make_names(naming_series, len(rows))
+    
+    fields = sorted({key for row in rows for key in row} | {"naming_series"})
+    columns = ["name", "owner", "modified_by", "creation", "modified", "docstatus", "idx"] + fields
+    
+    values = []
+    for name, row in zip(names, rows):
+        row = {"naming_series": naming_series, **row}
+        values.append([name, user, user, timestamp, timestamp, 0, 0] + [row.get(field) for field in fields])
+    
+    frappe.db.bulk_insert(doctype, columns, values, chunk_size=chunk_size)
+    record_logs(doctype, rows)
+    return names
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+
+# (site, key) -> (version, value), shared by everything in this worker process
+_process_cache = {}
+
+# How long a shared value is kept in Redis; superseded versions simply expire
+SHARED_TTL = 24 * 60 * 60
+
+def get_cached(key, builder, shared=False):
+    """Get a process-local value, rebuilding it when its version in Redis changes
+    
+    The version is read through frappe.cache(), which memoizes it for the rest
+    of the request or job, so steady-state reads cost no database queries and
+    at most one Redis round trip per request. With `shared`, built values are
+    also stored in Redis under their version, so other workers load them
+    instead of rebuilding. Do not share values holding secrets.
+    """
+    cache_key = (frappe.local.site, key)
+    version = get_version(key)
+    
+    entry = _process_cache.get(cache_key)
+    if entry and entry[0] == version:
+        return entry[1]
+    
+    if shared:
+        value = _get_shared(key, version, builder)
+    else:
+        value = builder()
+    
+    _process_cache[cache_key] = (version, value)
+    return value
+
+def get_version(key):
+    """Get the current version stamp of a cached value"""
+    version = frappe.cache().get_value(_version_key(key))
+    if not version:
+        version = frappe.generate_hash(length=12)
+        frappe.cache().set_value(_version_key(key), version)
+    return version
+
+def invalidate(key):
+    """Invalidate a cached value in every worker process
+    
+    Invalidates again after the current transaction commits, so a worker
+    that rebuilds from the not yet committed state cannot keep stale values.
+    """
+    _bump_version(key)
+    
+    after_commit = getattr(frappe.db, "after_commit", None)
+    if after_commit is not None:
+        after_commit.add(lambda: _bump_version(key))
+
+def _bump_version(key):
+    frappe.cache().set_value(_version_key(key), frappe.generate_hash(length=12))
+    _process_cache.pop((frappe.local.site, key), None)
+
+def _get_shared(key, version, builder):
+    shared_key = f"flashchat_cache:{key}:{version}"
+    value = frappe.cache().get_value(shared_key)
+    if value is None:
+        value = builder()
+        frappe.cache().set_value(shared_key, value, expires_in_sec=SHARED_TTL)
+    return value
+
+def _version_key(key):
+    return f"flashchat_cache_version:{key}"
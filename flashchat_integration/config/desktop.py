@@ -1,14 +1,14 @@
-
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-from frappe import _
-
-def get_data():
-	return {
-		"FlashChat Integration": {
-			"color": "blue",
-			"icon": "octicon octicon-comment",
-			"type": "module",
-			"label": _("FlashChat Integration")
-		}
-	}
+
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from frappe import _
+
+def get_data():
+	return {
+		"FlashChat Integration": {
+			"color": "blue",
+			"icon": "octicon octicon-comment",
+			"type": "module",
+			"label": _("FlashChat Integration")
+		}
+	}
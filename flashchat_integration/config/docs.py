@@ -1,11 +1,11 @@
-
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-
-source_link = "https://github.com/Erpflow-dev/flashchat_integration"
-headline = "SMS, WhatsApp & OTP Integration"
-sub_heading = "Complete messaging solution for ERPNext"
-
-def get_context(context):
-	context.brand_html = "FlashChat Integration"
-
+
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+source_link = "https://github.com/Erpflow-dev/flashchat_integration"
+headline = "SMS, WhatsApp & OTP Integration"
+sub_heading = "Complete messaging solution for ERPNext"
+
+def get_context(context):
+	context.brand_html = "FlashChat Integration"
+
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import cint, now
+
+# KEYS = counts hash, values hash
+# ARGV = number of counts, then (field, increment) pairs, then (field, value) pairs
+INCREMENT_SCRIPT = """
+local n = tonumber(ARGV[1])
+for i = 2, n * 2, 2 do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+for i = n * 2 + 2, #ARGV, 2 do
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+# Read and clear both hashes in one step, so increments made during a flush are kept for the next one
+DRAIN_SCRIPT = """
+local counts = redis.call('HGETALL', KEYS[1])
+local values = redis.call('HGETALL', KEYS[2])
+redis.call('DEL', KEYS[1], KEYS[2])
+return {counts, values}
+"""
+
+PEEK_SCRIPT = """
+return {redis.call('HMGET', KEYS[1], unpack(ARGV)), redis.call('HMGET', KEYS[2], unpack(ARGV))}
+"""
+
+# A pause is lifted after this long even if whoever paused the counter never resumed it
+MAX_PAUSE_SECONDS = 30 * 60
+
+# Every counter created in this process, flushed together by the scheduler
+_counters = []
+
+class CounterBuffer:
+    """Redis-buffered increments for counter fields of a doctype
+    
+    Increments and latest values (such as a last used timestamp) are held in
+    Redis hashes and written to the rows with one UPDATE per document when
+    flushed, so concurrent workers never contend for the same row lock.
+    `derived_fields` maps fields to SQL expressions recomputed from the
+    stored counts after each flush.
+    """
+    
+    def __init__(self, doctype, count_fields, value_fields=(), derived_fields=None):
+        self.doctype = doctype
+        self.count_fields = tuple(count_fields)
+        self.value_fields = tuple(value_fields)
+        self.derived_fields = derived_fields or {}
+        _counters.append(self)
+    
+    def increment(self, name, counts, values=None):
+        """Add `counts` ({field: increment}) and set `values` ({field: value}) for a document"""
+        counts = [(f"{name}:{field}", cint(amount)) for field, amount in counts.items() if cint(amount)]
+        values = [(f"{name}:{field}", value) for field, value in (values or {}).items() if value is not None]
+        if not counts and not values:
+            return
+        
+        args = [len(counts)]
+        for pair in counts + values:
+            args.extend(pair)
+        
+        self._run(INCREMENT_SCRIPT, *args)
+    
+    def get_pending(self, name):
+        """Get increments and values for a document that are not written to the database yet"""
+        fields = self.count_fields + self.value_fields
+        counts, values = self._run(PEEK_SCRIPT, *[f"{name}:{field}" for field in fields])
+        
+        pending = {field: cint(count) for field, count in zip(self.count_fields, counts)}
+        for field, value in zip(fields, values):
+            if field in self.value_fields and value is not None:
+                pending[field] = frappe.safe_decode(value)
+        
+        return pending
+    
+    def apply_pending(self, doc):
+        """Add pending increments and values to a loaded document, for display"""
+        for field, value in self.get_pending(doc.name).items():
+            if field in self.count_fields:
+                doc.set(field, cint(doc.get(field)) + value)
+            else:
+                doc.set(field, value)
+    
+    @contextmanager
+    def paused(self):
+        """Hold increments in Redis, on every worker, while the rows are rebuilt from source"""
+        key = self._pause_key()
+        frappe.cache().set(key, 1, ex=MAX_PAUSE_SECONDS)
+        try:
+            yield
+        finally:
+            frappe.cache().delete(key)
+    
+    def is_paused(self):
+        return bool(frappe.cache().exists(self._pause_key()))
+    
+    def flush(self):
+        """Write pending increments to the database for the current site, unless paused"""
+        if self.is_paused():
+            return 0
+        
+        counts, values = self._run(DRAIN_SCRIPT)
+        updates = {}
+        
+        for key, amount in zip(counts[::2], counts[1::2]):
+            name, field = frappe.safe_decode(key).rsplit(":", 1)
+            updates.setdefault(name, ({}, {}))[0][field] = cint(amount)
+        
+        for key, value in zip(values[::2], values[1::2]):
+            name, field = frappe.safe_decode(key).rsplit(":", 1)
+            updates.setdefault(name, ({}, {}))[1][field] = frappe.safe_decode(value)
+        
+        if not updates:
+            return 0
+        
+        try:
+            # Rows are always written in the same order, so concurrent flushes cannot deadlock
+            for name in sorted(updates):
+                self._update_row(name, *updates[name])
+            self._update_derived(tuple(updates))
+            frappe.db.commit()
+        except Exception:
+            # Put the increments back so they are retried on the next flush
+            frappe.db.rollback()
+            for name, (name_counts, name_values) in updates.items():
+                self.increment(name, name_counts, name_values)
+            raise
+        
+        return len(updates)
+    
+    def _update_row(self, name, counts, values):
+        assignments = []
+        params = []
+        
+        for field, amount in counts.items():
+            if field in self.count_fields:
+                assignments.append(f"`{field}` = coalesce(`{field}`, 0) + %s")
+                params.append(amount)
+        
+        for field, value in values.items():
+            if field in self.value_fields:
+                assignments.append(f"`{field}` = %s")
+                params.append(value)
+        
+        if assignments:
+            frappe.db.sql(
+                f"update `tab{self.doctype}` set {', '.join(assignments)} where `name` = %s",
+                params + [name]
+            )
+    
+    def _update_derived(self, names):
+        if not self.derived_fields:
+            return
+        
+        assignments = ", ".join(f"`{field}` = {expression}" for field, expression in self.derived_fields.items())
+        frappe.db.sql(
+            f"update `tab{self.doctype}` set {assignments} where `name` in %(names)s",
+            {"names": names}
+        )
+    
+    def _pause_key(self):
+        return frappe.cache().make_key(f"flashchat_counters_paused:{self.doctype}")
+    
+    def _run(self, script, *args):
+        cache = frappe.cache()
+        keys = [
+            cache.make_key(f"flashchat_counts:{self.doctype}"),
+            cache.make_key(f"flashchat_counter_values:{self.doctype}")
+        ]
+        return cache.register_script(script)(keys=keys, args=args)
+
+class KeyedCounterBuffer(CounterBuffer):
+    """CounterBuffer for rows identified by key fields instead of a name
+    
+    Increments are made for the key values joined with "|", and the first
+    flush that counts a key creates its row through the doctype's unique
+    index on `key_fields`.
+    """
+    
+    def __init__(self, doctype, key_fields, count_fields):
+        super().__init__(doctype, count_fields)
+        self.key_fields = tuple(key_fields)
+    
+    def make_key(self, *values):
+        return "|".join(str(value) for value in values)
+    
+    def _update_row(self, key, counts, values):
+        counts = {field: amount for field, amount in counts.items() if field in self.count_fields}
+        if not counts:
+            return
+        
+        timestamp = now()
+        row = dict(zip(self.key_fields, key.split("|", len(self.key_fields) - 1)))
+        columns = ["name", "owner", "modified_by", "creation", "modified", "docstatus", "idx"] + list(row) + list(counts)
+        params = [frappe.generate_hash(length=10), "Administrator", "Administrator", timestamp, timestamp, 0, 0]
+        params += list(row.values()) + list(counts.values())
+        
+        column_names = ", ".join(f"`{column}`" for column in columns)
+        placeholders = ", ".join(["%s"] * len(columns))
+        updates = ", ".join(f"`{field}` = coalesce(`{field}`, 0) + values(`{field}`)" for field in counts)
+        
+        frappe.db.sql(f"""
+            insert into `tab{self.doctype}` ({column_names})
+            values ({placeholders})
+            on duplicate key update {updates}, `modified` = values(`modified`)
+        """, params)
+
+def flush_all():
+    """Write every buffered counter to the database
+    
+    Runs from the scheduler every minute.
+    """
+    for counter in _counters:
+        try:
+            counter.flush()
+        except Exception as e:
+            frappe.log_error(f"Failed to write {counter.doctype} counters: {str(e)}", "FlashChat Counters")
+
+template_usage = CounterBuffer("Message Template", ["usage_count"], ["last_used"])
+
+workflow_stats = CounterBuffer(
+    "FlashChat Workflow",
+    ["execution_count", "success_count", "failure_count"],
+    ["last_executed"],
+    {
+        "average_success_rate": "case when coalesce(`execution_count`, 0) > 0 "
+            "then coalesce(`success_count`, 0) * 100.0 / `execution_count` else 0 end"
+    }
+)
+
+daily_log_counts = KeyedCounterBuffer(
+    "FlashChat Daily Stats",
+    ["log_type", "stats_date", "message_type", "status"],
+    ["log_count"]
+)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+from collections import Counter
+
+import frappe
+from frappe.utils import add_days, getdate, now, today
+
+from flashchat_integration.archive import ARCHIVE_DOCTYPE, archive_exists
+from flashchat_integration.counters import daily_log_counts
+
+STATS_DOCTYPE = "FlashChat Daily Stats"
+
+# Log doctype -> (log type, date field the day is taken from)
+STATS_SOURCES = {
+    "FlashChat Message Log": ("Message", "sent_at"),
+    "FlashChat Workflow Log": ("Workflow", "execution_time")
+}
+
+# Closed days recounted from the logs by the daily repair run. Today is left to the
+# incremental counts, which are still arriving for it.
+REBUILD_DAYS = 2
+
+def record_logs(doctype, rows):
+    """Add newly inserted log rows or documents to the daily counts"""
+    if doctype not in STATS_SOURCES or not rows:
+        return
+    
+    counts = Counter(key for key in (_get_key(doctype, row) for row in rows) if key)
+    _add_counts(doctype, counts)
+
+def record_change(doctype, before, after):
+    """Move a log from its old day, message type and status to its new ones"""
+    if doctype not in STATS_SOURCES:
+        return
+    
+    old_key, new_key = _get_key(doctype, before), _get_key(doctype, after)
+    if old_key == new_key:
+        return
+    
+    counts = Counter()
+    if old_key:
+        counts[old_key] -= 1
+    if new_key:
+        counts[new_key] += 1
+    _add_counts(doctype, counts)
+
+def get_daily_counts(log_type, from_date):
+    """Get {(message_type, status): count} for days on or after `from_date`"""
+    rows = frappe.db.sql(f"""
+        select message_type, status, sum(log_count)
+        from `tab{STATS_DOCTYPE}`
+        where log_type = %(log_type)s and stats_date >= %(from_date)s
+        group by message_type, status
+    """, {"log_type": log_type, "from_date": getdate(from_date)})
+    
+    return {(message_type, status): int(count or 0) for message_type, status, count in rows}
+
+def rebuild_daily_stats(from_date=None, to_date=None):
+    """Recount days from `from_date` up to, not including, `to_date` from the logs
+    
+    Replaces the kept counts for those days. Repairs counts missed by writes
+    that bypass the document and bulk insert paths. Counts the archive too,
+    so older days can be rebuilt after their logs were archived. Without
+    dates, every day is recounted. Buffered increments are written first and
+    held back until the recount is committed, so no flush lands in between.
+    """
+    daily_log_counts.flush()
+    
+    with daily_log_counts.paused():
+        for doctype, (log_type, date_field) in STATS_SOURCES.items():
+            _rebuild_source(doctype, log_type, date_field, from_date, to_date)
+
+def rebuild_recent_stats():
+    """Recount the last few closed days, in case a write was missed or counted twice"""
+    rebuild_daily_stats(add_days(today(), -REBUILD_DAYS), today())
+
+def _rebuild_source(doctype, log_type, date_field, from_date, to_date):
+    conditions = [f"`{date_field}` is not null"]
+    stats_conditions = ["log_type = %(log_type)s"]
+    if from_date:
+        conditions.append(f"`{date_field}` >= %(from_date)s")
+        stats_conditions.append("stats_date >= %(from_date)s")
+    if to_date:
+        conditions.append(f"`{date_field}` < %(to_date)s")
+        stats_conditions.append("stats_date < %(to_date)s")
+    condition = " and ".join(conditions)
+    
+    sources = [doctype]
+    if doctype == "FlashChat Message Log" and archive_exists():
+        sources.append(ARCHIVE_DOCTYPE)
+    
+    union = " union all ".join(
+        f"select date(`{date_field}`) as stats_date, coalesce(message_type, '') as message_type, "
+        f"coalesce(status, '') as status from `tab{source}` where {condition}"
+        for source in sources
+    )
+    values = {
+        "log_type": log_type,
+        "from_date": getdate(from_date) if from_date else None,
+        "to_date": getdate(to_date) if to_date else None,
+        "now": now()
+    }
+    
+    frappe.db.sql(f"delete from `tab{STATS_DOCTYPE}` where {' and '.join(stats_conditions)}", values)
+    frappe.db.sql(f"""
+        insert into `tab{STATS_DOCTYPE}`
+            (name, owner, modified_by, creation, modified, docstatus, idx,
+            log_type, stats_date, message_type, status, log_count)
+        select substring(md5(concat(%(log_type)s, logs.stats_date, logs.message_type, logs.status)), 1, 10),
+            'Administrator', 'Administrator', %(now)s, %(now)s, 0, 0,
+            %(log_type)s, logs.stats_date, logs.message_type, logs.status, count(*)
+        from ({union}) logs
+        group by logs.stats_date, logs.message_type, logs.status
+    """, values)
+    frappe.db.commit()
+
+def _get_key(doctype, row):
+    # (day, message type, status) a log is counted under, or None if it has no date yet
+    date_field = STATS_SOURCES[doctype][1]
+    value = row.get(date_field)
+    if not value:
+        return None
+    return (getdate(value), row.get("message_type") or "", row.get("status") or "")
+
+def _add_counts(doctype, counts):
+    # Buffered in Redis and written by counters.flush_all, so log writers never wait on the stats rows
+    log_type = STATS_SOURCES[doctype][0]
+    
+    for (stats_date, message_type, status), count in sorted(counts.items()):
+        if count:
+            daily_log_counts.increment(
+                daily_log_counts.make_key(log_type, stats_date, message_type, status),
+                {"log_count": count}
+            )
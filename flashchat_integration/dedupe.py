@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+
+from flashchat_integration.api import format_phone_number
+
+# How long a campaign's phone claims are kept if it never finishes
+DEFAULT_TTL = 7 * 24 * 60 * 60
+
+# KEYS[1] = hash of phone -> recipient that claimed it
+# ARGV = (phone, recipient) pairs, then ttl
+# Returns 1 for each recipient that owns its phone, 0 for duplicates
+CLAIM_SCRIPT = """
+local keep = {}
+for i = 1, #ARGV - 1, 2 do
+    local owner = redis.call('HGET', KEYS[1], ARGV[i])
+    if not owner then
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+        owner = ARGV[i + 1]
+    end
+    keep[#keep + 1] = owner == ARGV[i + 1] and 1 or 0
+end
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[#ARGV]))
+return keep
+"""
+
+class PhoneDeduper:
+    """Redis record of which recipient first claimed each phone number
+    
+    Shared by every worker, so a number is kept for exactly one recipient no
+    matter which chunk or worker reaches it first. Claims are idempotent: a
+    recipient checked again after a retry still owns its number. Memory is one
+    hash entry per distinct number, held in Redis rather than in the workers.
+    """
+    
+    def __init__(self, key, ttl=DEFAULT_TTL):
+        self.key = frappe.cache().make_key(f"flashchat_dedupe:{key}")
+        self.ttl = ttl
+    
+    def claim(self, recipients):
+        """Claim numbers for (phone, recipient) pairs, returning True for each pair to keep"""
+        if not recipients:
+            return []
+        
+        args = []
+        for phone, recipient in recipients:
+            args.extend((phone, recipient))
+        args.append(self.ttl)
+        
+        keep = frappe.cache().register_script(CLAIM_SCRIPT)(keys=[self.key], args=args)
+        return [bool(int(flag)) for flag in keep]
+    
+    def clear(self):
+        frappe.cache().delete(self.key)
+
+def dedupe_recipients(recipients):
+    """Yield recipients whose normalized mobile number has not been seen yet
+    
+    Runs in one pass, holding only the set of numbers seen so far. Use
+    PhoneDeduper when the recipients are spread across workers.
+    """
+    seen = set()
+    for recipient in recipients:
+        phone = format_phone_number(str(recipient["mobile_no"])) if recipient.get("mobile_no") else None
+        if phone:
+            if phone in seen:
+                continue
+            seen.add(phone)
+        yield recipient
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+
+class FlashChatAudienceMember(Document):
+    pass
+
+def on_doctype_update():
+    """Index members by source and by the segment filters campaigns target"""
+    frappe.db.add_unique("FlashChat Audience Member", ["source_doctype", "source_name"], constraint_name="unique_source")
+    frappe.db.add_index("FlashChat Audience Member", ["source_doctype", "customer_group", "territory"])
+    frappe.db.add_index("FlashChat Audience Member", ["source_doctype", "lead_source", "territory"])
@@ -1,4 +1,4 @@
-### flashchat_integration/flashchat_contact/__init__.py
-
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
+### flashchat_integration/flashchat_contact/__init__.py
+
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
@@ -1,213 +1,591 @@
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-import frappe
-from frappe.model.document import Document
-from frappe.utils import now, add_to_date, cint, flt
-import json
-
-class FlashChatCampaign(Document):
-    def validate(self):
-        """Validate campaign"""
-        self.validate_send_time()
-        self.calculate_recipients()
-    
-    def validate_send_time(self):
-        """Validate send time is in future"""
-        if self.send_at and self.send_at < now():
-            frappe.throw("Send time must be in the future")
-    
-    def calculate_recipients(self):
-        """Calculate number of recipients"""
-        if self.target_audience == "All Contacts":
-            self.total_recipients = frappe.db.count("Contact", {"mobile_no": ["!=", ""]})
-        elif self.target_audience == "Customers":
-            filters = {"mobile_no": ["!=", ""]}
-            if self.customer_group:
-                filters["customer_group"] = self.customer_group
-            if self.territory:
-                filters["territory"] = self.territory
-            self.total_recipients = frappe.db.count("Customer", filters)
-        elif self.target_audience == "Leads":
-            filters = {"mobile_no": ["!=", ""]}
-            if self.lead_source:
-                filters["source"] = self.lead_source
-            if self.territory:
-                filters["territory"] = self.territory
-            self.total_recipients = frappe.db.count("Lead", filters)
-        elif self.target_audience == "Custom Filter":
-            # TODO: Implement custom filter logic
-            self.total_recipients = 0
-    
-    def schedule_campaign(self):
-        """Schedule campaign for sending"""
-        if self.status != "Draft":
-            frappe.throw("Only draft campaigns can be scheduled")
-        
-        if not self.send_at:
-            frappe.throw("Send time is required")
-        
-        self.status = "Scheduled"
-        self.save()
-        frappe.msgprint("Campaign scheduled successfully")
-    
-    def start_campaign(self):
-        """Start campaign immediately"""
-        if self.status not in ["Draft", "Scheduled"]:
-            frappe.throw("Campaign cannot be started")
-        
-        self.status = "Processing"
-        self.save()
-        
-        # Process campaign in background
-        frappe.enqueue(
-            "flashchat_integration.flashchat_campaign.flashchat_campaign.process_campaign",
-            queue="long",
-            campaign_name=self.name
-        )
-        
-        frappe.msgprint("Campaign started successfully")
-    
-    def cancel_campaign(self):
-        """Cancel campaign"""
-        if self.status in ["Completed", "Cancelled"]:
-            frappe.throw("Campaign cannot be cancelled")
-        
-        self.status = "Cancelled"
-        self.save()
-        frappe.msgprint("Campaign cancelled successfully")
-
-@frappe.whitelist()
-def schedule_campaign(name):
-    """Schedule a campaign"""
-    doc = frappe.get_doc("FlashChat Campaign", name)
-    doc.schedule_campaign()
-
-@frappe.whitelist()
-def start_campaign(name):
-    """Start a campaign"""
-    doc = frappe.get_doc("FlashChat Campaign", name)
-    doc.start_campaign()
-
-@frappe.whitelist()
-def cancel_campaign(name):
-    """Cancel a campaign"""
-    doc = frappe.get_doc("FlashChat Campaign", name)
-    doc.cancel_campaign()
-
-def process_campaign(campaign_name):
-    """Process campaign in background"""
-    try:
-        campaign = frappe.get_doc("FlashChat Campaign", campaign_name)
-        
-        if campaign.status != "Processing":
-            return
-        
-        # Get recipients
-        recipients = get_campaign_recipients(campaign)
-        
-        # Send messages
-        from flashchat_integration.api import FlashChatAPI
-        api = FlashChatAPI()
-        
-        sent_count = 0
-        failed_count = 0
-        
-        for recipient in recipients:
-            try:
-                if campaign.message_type == "SMS":
-                    result = api.send_sms(
-                        phone=recipient["mobile_no"],
-                        message=campaign.message_content,
-                        reference_doctype="FlashChat Campaign",
-                        reference_name=campaign.name
-                    )
-                elif campaign.message_type == "WhatsApp":
-                    # Get WhatsApp account
-                    accounts = api.get_whatsapp_accounts()
-                    if accounts.get("success") and accounts.get("accounts"):
-                        account_id = accounts["accounts"][0]["id"]
-                        result = api.send_whatsapp(
-                            account=account_id,
-                            recipient=recipient["mobile_no"],
-                            message=campaign.message_content,
-                            reference_doctype="FlashChat Campaign",
-                            reference_name=campaign.name
-                        )
-                    else:
-                        raise Exception("No WhatsApp accounts available")
-                
-                if result.get("success"):
-                    sent_count += 1
-                else:
-                    failed_count += 1
-                    
-            except Exception as e:
-                failed_count += 1
-                frappe.log_error(f"Campaign message failed: {str(e)}", "FlashChat Campaign")
-        
-        # Update campaign statistics
-        campaign.messages_sent = sent_count
-        campaign.messages_failed = failed_count
-        campaign.status = "Completed"
-        
-        if campaign.total_recipients > 0:
-            campaign.success_rate = (sent_count / campaign.total_recipients) * 100
-        
-        campaign.save()
-        
-    except Exception as e:
-        # Update campaign status to failed
-        campaign = frappe.get_doc("FlashChat Campaign", campaign_name)
-        campaign.status = "Failed"
-        campaign.save()
-        
-        frappe.log_error(f"Campaign processing failed: {str(e)}", "FlashChat Campaign Processing")
-
-def get_campaign_recipients(campaign):
-    """Get recipients for campaign"""
-    recipients = []
-    
-    if campaign.target_audience == "All Contacts":
-        recipients = frappe.get_all(
-            "Contact",
-            filters={"mobile_no": ["!=", ""]},
-            fields=["name", "mobile_no", "first_name", "last_name"]
-        )
-    elif campaign.target_audience == "Customers":
-        filters = {"mobile_no": ["!=", ""]}
-        if campaign.customer_group:
-            filters["customer_group"] = campaign.customer_group
-        if campaign.territory:
-            filters["territory"] = campaign.territory
-        
-        recipients = frappe.get_all(
-            "Customer",
-            filters=filters,
-            fields=["name", "mobile_no", "customer_name"]
-        )
-    elif campaign.target_audience == "Leads":
-        filters = {"mobile_no": ["!=", ""]}
-        if campaign.lead_source:
-            filters["source"] = campaign.lead_source
-        if campaign.territory:
-            filters["territory"] = campaign.territory
-        
-        recipients = frappe.get_all(
-            "Lead",
-            filters=filters,
-            fields=["name", "mobile_no", "lead_name"]
-        )
-    elif campaign.target_audience == "Custom Filter":
-        # TODO: Implement custom filter logic
-        if campaign.contact_filters:
-            try:
-                custom_filters = json.loads(campaign.contact_filters)
-                recipients = frappe.get_all(
-                    "Contact",
-                    filters=custom_filters,
-                    fields=["name", "mobile_no", "first_name", "last_name"]
-                )
-            except:
-                recipients = []
-    
-    return recipients
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now, add_to_date, cint, flt, format_date, get_datetime, time_diff_in_seconds
+from frappe.utils.background_jobs import is_job_enqueued
+import math
+import os
+import socket
+import time
+from flashchat_integration.doctype.flashchat_campaign_chunk.flashchat_campaign_chunk import (
+    checkpoint_chunk, claim_chunk, complete_chunk, create_chunk, defer_chunk, get_due_campaigns,
+    has_open_chunks, release_chunk
+)
+from flashchat_integration.api import format_phone_number
+from flashchat_integration.audience import count_audience, get_audience_query, get_audience_preview, get_full_scans
+from flashchat_integration.dedupe import PhoneDeduper
+from flashchat_integration.doctype.flashchat_settings.flashchat_settings import get_settings
+from flashchat_integration.log_buffer import flush_due
+from flashchat_integration.rate_limiter import RateLimiter
+from flashchat_integration.template_engine import compile_template
+
+# Recipients per chunk, the unit of work leased to a campaign worker
+CAMPAIGN_BATCH_SIZE = 500
+
+# process_campaign_chunks jobs queued per campaign unless set in FlashChat Settings
+DEFAULT_CAMPAIGN_WORKERS = 4
+
+# Fields that decide who a campaign is sent to
+AUDIENCE_FIELDS = ["target_audience", "customer_group", "territory", "lead_source", "contact_filters"]
+
+# A Processing campaign without progress for this long is assumed to have lost its job
+CAMPAIGN_STALL_MINUTES = 30
+
+# Longest a worker sleeps for the send rate or rate limit before deferring its chunk instead
+MAX_PACING_WAIT = 60
+
+# Paced sends are reserved in batches of about this many seconds of the target rate
+PACING_BATCH_SECONDS = 5
+
+# Target messages per minute given to each worker of a paced campaign
+PACED_MESSAGES_PER_WORKER = 600
+
+# A worker hands over to a fresh job after this long, well inside the long queue timeout
+WORKER_RUN_MINUTES = 20
+
+class FlashChatCampaign(Document):
+    def validate(self):
+        """Validate campaign"""
+        self.validate_send_time()
+        self.validate_pacing()
+        self.validate_custom_filter()
+        self.calculate_recipients()
+    
+    def validate_send_time(self):
+        """Validate send time is in future"""
+        if self.send_at and self.send_at < now():
+            frappe.throw("Send time must be in the future")
+    
+    def validate_pacing(self):
+        """Validate the send pacing options"""
+        if self.pacing_mode == "Messages per Minute" and cint(self.messages_per_minute) <= 0:
+            frappe.throw("Messages per Minute must be greater than zero")
+        elif self.pacing_mode == "Spread Over Hours" and flt(self.spread_over_hours) <= 0:
+            frappe.throw("Spread Over Hours must be greater than zero")
+        elif self.pacing_mode == "Complete By":
+            if not self.complete_by:
+                frappe.throw("Complete By is required")
+            
+            if self.status in ["Draft", "Scheduled"] and get_datetime(self.complete_by) <= get_datetime(self.send_at or now()):
+                frappe.throw("Complete By must be after the send time")
+    
+    def validate_custom_filter(self):
+        """Validate Contact Filters and warn when they cannot use an index"""
+        if self.target_audience != "Custom Filter":
+            return
+        
+        if not (self.contact_filters or "").strip():
+            frappe.throw("Contact Filters are required for a Custom Filter audience")
+        
+        if not self.is_new() and not self.has_value_changed("contact_filters") and not self.has_value_changed("target_audience"):
+            return
+        
+        # Throws for unknown fields, operators or malformed JSON
+        full_scans = get_full_scans(self)
+        if full_scans:
+            rows = max(cint(row.get("rows")) for row in full_scans)
+            frappe.msgprint(
+                f"These Contact Filters scan about {rows} contacts without an index. "
+                "The campaign will still send, but counting and planning it will be slow.",
+                indicator="orange",
+                alert=True
+            )
+    
+    def calculate_recipients(self):
+        """Calculate number of recipients when the audience changes"""
+        if not self.is_new() and not any(self.has_value_changed(field) for field in AUDIENCE_FIELDS):
+            return
+        
+        self.total_recipients = count_audience(self)
+    
+    def schedule_campaign(self):
+        """Schedule campaign for sending"""
+        if self.status != "Draft":
+            frappe.throw("Only draft campaigns can be scheduled")
+        
+        if not self.send_at:
+            frappe.throw("Send time is required")
+        
+        self.status = "Scheduled"
+        self.save()
+        frappe.msgprint("Campaign scheduled successfully")
+    
+    def start_campaign(self):
+        """Start campaign immediately"""
+        if self.status not in ["Draft", "Scheduled"]:
+            frappe.throw("Campaign cannot be started")
+        
+        self.status = "Processing"
+        self.save()
+        
+        # Process campaign in background
+        enqueue_campaign(self.name)
+        
+        frappe.msgprint("Campaign started successfully")
+    
+    def cancel_campaign(self):
+        """Cancel campaign"""
+        if self.status in ["Completed", "Cancelled"]:
+            frappe.throw("Campaign cannot be cancelled")
+        
+        self.status = "Cancelled"
+        self.save()
+        frappe.msgprint("Campaign cancelled successfully")
+
+@frappe.whitelist()
+def schedule_campaign(name):
+    """Schedule a campaign"""
+    doc = frappe.get_doc("FlashChat Campaign", name)
+    doc.schedule_campaign()
+
+@frappe.whitelist()
+def start_campaign(name):
+    """Start a campaign"""
+    doc = frappe.get_doc("FlashChat Campaign", name)
+    doc.start_campaign()
+
+@frappe.whitelist()
+def cancel_campaign(name):
+    """Cancel a campaign"""
+    doc = frappe.get_doc("FlashChat Campaign", name)
+    doc.cancel_campaign()
+
+@frappe.whitelist()
+def preview_audience(name, limit=10):
+    """Count a campaign's audience and list its first recipients"""
+    doc = frappe.get_doc("FlashChat Campaign", name)
+    doc.check_permission("read")
+    
+    try:
+        preview = get_audience_preview(doc, min(cint(limit) or 10, 50))
+        return {"success": True, **preview}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+def enqueue_campaign(campaign_name):
+    """Queue a campaign for processing"""
+    frappe.enqueue(
+        "flashchat_integration.doctype.flashchat_campaign.flashchat_campaign.process_campaign",
+        queue="long",
+        campaign_name=campaign_name
+    )
+
+def process_campaign(campaign_name):
+    """Split a campaign into recipient chunks and fan them out to workers
+    
+    Chunks are planned one page of recipient names at a time, committing the
+    cursor with each chunk, so a restarted job continues planning where it
+    stopped. Sending is done by process_campaign_chunks jobs on any worker.
+    """
+    try:
+        campaign = frappe.get_doc("FlashChat Campaign", campaign_name)
+        
+        if campaign.status != "Processing":
+            return
+        
+        from flashchat_integration.whatsapp_accounts import get_accounts
+        
+        if campaign.message_type == "WhatsApp" and not get_accounts():
+            raise Exception("No WhatsApp accounts available")
+        
+        if not campaign.started_at:
+            # Count the audience as it is now, not as it was when the campaign was saved
+            campaign.started_at = now()
+            campaign.total_recipients = count_audience(campaign, cached=False)
+        
+        campaign.send_rate = get_target_send_rate(campaign)
+        save_campaign_progress(campaign.name, {
+            "started_at": campaign.started_at,
+            "total_recipients": campaign.total_recipients,
+            "send_rate": campaign.send_rate
+        })
+        
+        plan_campaign_chunks(campaign)
+        enqueue_campaign_workers(campaign)
+        update_campaign_eta(campaign.name)
+        
+    except Exception as e:
+        mark_campaign_failed(campaign_name, e)
+
+def enqueue_campaign_workers(campaign, workers=None):
+    """Queue jobs to send a campaign's chunks, fewer when it is paced to a low rate"""
+    if workers is None:
+        workers = cint(get_settings().get("campaign_workers")) or DEFAULT_CAMPAIGN_WORKERS
+        if cint(campaign.send_rate):
+            workers = min(workers, math.ceil(cint(campaign.send_rate) / PACED_MESSAGES_PER_WORKER))
+    
+    # A slot whose worker is still queued or running is not given another one
+    for slot in range(workers):
+        if not is_worker_enqueued(campaign.name, slot):
+            enqueue_campaign_worker(campaign.name, slot)
+
+def enqueue_campaign_worker(campaign_name, slot, generation=0):
+    """Queue one worker under its slot's job id
+    
+    A worker that runs out of time queues the next generation of its slot,
+    which alternates between two job ids so it never collides with itself.
+    """
+    frappe.enqueue(
+        "flashchat_integration.doctype.flashchat_campaign.flashchat_campaign.process_campaign_chunks",
+        queue="long",
+        job_id=get_worker_job_id(campaign_name, slot, generation),
+        deduplicate=True,
+        campaign_name=campaign_name,
+        slot=slot,
+        generation=generation
+    )
+
+def is_worker_enqueued(campaign_name, slot):
+    return any(is_job_enqueued(get_worker_job_id(campaign_name, slot, generation)) for generation in (0, 1))
+
+def get_worker_job_id(campaign_name, slot, generation=0):
+    return f"flashchat_campaign_worker:{campaign_name}:{slot}:{generation % 2}"
+
+def plan_campaign_chunks(campaign):
+    """Record recipient name ranges as chunks, continuing after the saved cursor"""
+    doctype, filters, fields = get_recipient_query(campaign)
+    if not doctype:
+        return
+    
+    after = campaign.recipient_cursor
+    chunk_index = frappe.db.count("FlashChat Campaign Chunk", {"campaign": campaign.name})
+    
+    while True:
+        names = frappe.get_all(
+            doctype,
+            filters=add_name_range(filters, after),
+            fields=["name"],
+            order_by="name asc",
+            limit_page_length=CAMPAIGN_BATCH_SIZE
+        )
+        if not names:
+            return
+        
+        create_chunk(campaign.name, chunk_index, after, names[-1].name, len(names))
+        after = names[-1].name
+        chunk_index += 1
+        
+        # Commits the chunk together with the cursor that covers it
+        save_campaign_progress(campaign.name, {"recipient_cursor": after})
+        
+        if len(names) < CAMPAIGN_BATCH_SIZE:
+            return
+
+def process_campaign_chunks(campaign_name, slot=0, generation=0):
+    """Claim and send chunks of a campaign until none are due
+    
+    Any number of these jobs can run at once, on any bench node. Each chunk is
+    leased by one job at a time, and chunks whose lease expires are claimed
+    again by another job. Chunks held up by the send rate or rate limit are
+    deferred and picked up again by dispatch_due_campaigns.
+    """
+    owner = f"{socket.gethostname()}:{os.getpid()}:{frappe.generate_hash(length=8)}"
+    stop_at = time.monotonic() + WORKER_RUN_MINUTES * 60
+    
+    try:
+        campaign = frappe.get_doc("FlashChat Campaign", campaign_name)
+        sender = CampaignSender(campaign)
+        
+        # Stop if the campaign was cancelled while running
+        while frappe.db.get_value("FlashChat Campaign", campaign.name, "status") == "Processing":
+            if time.monotonic() >= stop_at:
+                enqueue_campaign_worker(campaign.name, slot, generation + 1)
+                return
+            
+            chunk = claim_chunk(campaign.name, owner)
+            if not chunk:
+                break
+            
+            try:
+                if not sender.send_chunk(chunk, owner, stop_at):
+                    break
+            except Exception as e:
+                frappe.db.rollback()
+                release_chunk(chunk, owner)
+                frappe.log_error(f"Campaign chunk {chunk.name} failed: {str(e)}", "FlashChat Campaign Processing")
+        
+        finish_campaign(campaign.name)
+        
+    except Exception as e:
+        mark_campaign_failed(campaign_name, e)
+
+class CampaignSender:
+    """Sends leased chunks of one campaign, paced to the campaign's target rate
+    
+    The pacing token bucket lives in Redis, so all workers of a campaign share
+    one send rate. Messages refused by the hourly rate limit are deferred, not
+    failed. Recipients whose normalized number was already claimed by another
+    recipient of the campaign are skipped as duplicates.
+    """
+    
+    def __init__(self, campaign):
+        from flashchat_integration.api import FlashChatAPI
+        
+        self.campaign = campaign
+        self.api = FlashChatAPI()
+        
+        # Compile the message once, then personalise it per recipient
+        self.template = compile_template(campaign.message_content)
+        self.default_context = get_campaign_context(campaign)
+        
+        self.pacer = get_campaign_pacer(campaign)
+        self.deduper = get_campaign_deduper(campaign.name)
+        self.batch_size = max(cint(campaign.send_rate) * PACING_BATCH_SECONDS // 60, 1)
+    
+    def send_chunk(self, chunk, owner, stop_at):
+        """Send the recipients of a leased chunk not sent yet, recording progress after every batch
+        
+        Returns False when the chunk was deferred for a long wait, so the
+        worker should stop claiming chunks for now.
+        """
+        recipients = self.get_recipients(chunk)
+        position = 0
+        
+        while position < len(recipients):
+            if time.monotonic() >= stop_at:
+                defer_chunk(chunk, owner, now())
+                return True
+            
+            count = len(recipients) - position
+            if self.pacer:
+                count, wait = self.pacer.reserve(min(count, self.batch_size), partial=True)
+                if not count:
+                    if not self.wait_or_defer(chunk, owner, wait):
+                        return False
+                    continue
+            
+            batch = recipients[position:position + count]
+            results = self.send(batch)
+            
+            # Rate limited messages are always the last of a batch; they are sent again later
+            limited = next((i for i, result in enumerate(results) if result.get("rate_limited")), len(results))
+            sent = sum(1 for result in results[:limited] if result.get("success"))
+            duplicates = sum(1 for result in results[:limited] if result.get("duplicate"))
+            if self.pacer:
+                self.pacer.release(len(results) - limited + duplicates)
+            
+            if limited:
+                failed = limited - sent - duplicates
+                if not checkpoint_chunk(chunk, owner, batch[limited - 1]["name"], sent, failed, duplicates):
+                    # The lease expired and another worker has the chunk now
+                    return True
+                
+                # The checkpoint committed, so buffered logs can be written without splitting a transaction
+                flush_due()
+                position += limited
+                update_campaign_eta(self.campaign.name)
+            
+            if limited < len(results):
+                wait = self.api.get_rate_limit_wait(self.campaign.message_type, len(results) - limited)
+                if not self.wait_or_defer(chunk, owner, wait):
+                    return False
+        
+        complete_chunk(chunk, owner, 0, 0)
+        return True
+    
+    def wait_or_defer(self, chunk, owner, wait):
+        """Sleep through a short wait, or defer the chunk past a long one and return False"""
+        if wait <= MAX_PACING_WAIT:
+            time.sleep(max(wait, 0.1))
+            return True
+        
+        resume_at = add_to_date(now(), seconds=math.ceil(wait))
+        defer_chunk(chunk, owner, resume_at)
+        update_campaign_eta(self.campaign.name, resume_at)
+        return False
+    
+    def get_recipients(self, chunk):
+        """Get recipients of a chunk after the last one already sent"""
+        doctype, filters, fields = get_recipient_query(self.campaign)
+        return frappe.get_all(
+            doctype,
+            filters=add_name_range(filters, chunk.last_recipient or chunk.start_after, chunk.end_at),
+            fields=fields,
+            order_by="name asc"
+        )
+    
+    def send(self, recipients):
+        """Send the personalised campaign message to recipients, one result per recipient"""
+        keep = self.claim_phones(recipients)
+        unique = [recipient for recipient, is_unique in zip(recipients, keep) if is_unique]
+        
+        # Templates see the Contact, Customer or Lead name, not the audience row name
+        contexts = [dict(recipient, name=recipient.get("source_name") or recipient["name"]) for recipient in unique]
+        messages = self.template.render_many(contexts, self.default_context)
+        items = [
+            (recipient["mobile_no"], message, "FlashChat Campaign", self.campaign.name)
+            for recipient, message in zip(unique, messages)
+        ]
+        
+        if self.campaign.message_type == "SMS":
+            results = self.api.send_sms_batch(items)
+        elif self.campaign.message_type == "WhatsApp":
+            results = self.api.send_whatsapp_batch(None, items)
+        else:
+            results = [{"success": False, "error": "Unsupported message type"} for item in items]
+        
+        # Put the duplicates back in recipient order
+        results = iter(results)
+        return [
+            next(results) if is_unique else {"success": False, "duplicate": True, "error": "Duplicate phone number"}
+            for is_unique in keep
+        ]
+    
+    def claim_phones(self, recipients):
+        """Claim each recipient's normalized number for this campaign, False for duplicates"""
+        phones = [
+            format_phone_number(str(recipient["mobile_no"])) if recipient.get("mobile_no") else None
+            for recipient in recipients
+        ]
+        claims = iter(self.deduper.claim([
+            (phone, recipient["name"]) for phone, recipient in zip(phones, recipients) if phone
+        ]))
+        
+        # Recipients without a number are kept, to fail in the send like before
+        return [next(claims) if phone else True for phone in phones]
+
+def get_target_send_rate(campaign):
+    """Get the messages per minute a campaign is paced at, or 0 to send as fast as allowed"""
+    if campaign.pacing_mode == "Messages per Minute":
+        return cint(campaign.messages_per_minute)
+    elif campaign.pacing_mode == "Complete By":
+        deadline = campaign.complete_by
+    elif campaign.pacing_mode == "Spread Over Hours":
+        deadline = add_to_date(campaign.started_at or now(), hours=flt(campaign.spread_over_hours))
+    else:
+        return 0
+    
+    remaining = max(cint(campaign.total_recipients) - cint(campaign.processed_recipients), 0)
+    minutes = time_diff_in_seconds(deadline, now()) / 60
+    if not remaining or minutes <= 0:
+        # Past the deadline, the rest goes out as fast as the rate limits allow
+        return 0
+    
+    return max(math.ceil(remaining / minutes), 1)
+
+def get_campaign_pacer(campaign):
+    """Get the token bucket shared by all workers of a paced campaign, or None"""
+    if not cint(campaign.send_rate):
+        return None
+    return RateLimiter(f"campaign:{campaign.name}", cint(campaign.send_rate), period=60)
+
+def get_campaign_deduper(campaign_name):
+    """Get the record of phone numbers already claimed by recipients of a campaign"""
+    return PhoneDeduper(f"campaign:{campaign_name}")
+
+def update_campaign_eta(campaign_name, resume_at=None):
+    """Estimate when a campaign finishes, from its target rate or the rate reached so far"""
+    progress = frappe.db.get_value(
+        "FlashChat Campaign",
+        campaign_name,
+        ["total_recipients", "processed_recipients", "send_rate", "started_at"],
+        as_dict=True
+    )
+    if not progress:
+        return
+    
+    processed = cint(progress.processed_recipients)
+    rate = cint(progress.send_rate)
+    if not rate and processed and progress.started_at:
+        minutes = time_diff_in_seconds(now(), progress.started_at) / 60
+        rate = processed / minutes if minutes > 0 else 0
+    
+    if not rate:
+        return
+    
+    remaining = max(cint(progress.total_recipients) - processed, 0)
+    eta = add_to_date(resume_at or now(), seconds=math.ceil(remaining * 60 / rate))
+    frappe.db.set_value("FlashChat Campaign", campaign_name, "estimated_completion", eta, update_modified=False)
+    frappe.db.commit()
+
+def dispatch_due_campaigns():
+    """Queue workers for campaigns whose deferred chunks are due again
+    
+    Runs from the scheduler every minute. Worker slots that already have a
+    queued or running job are skipped, so a busy queue is not flooded.
+    """
+    for campaign_name in get_due_campaigns():
+        campaign = frappe.get_doc("FlashChat Campaign", campaign_name)
+        enqueue_campaign_workers(campaign)
+
+def finish_campaign(campaign_name):
+    """Mark a campaign completed once all of its chunks are closed"""
+    if has_open_chunks(campaign_name):
+        return
+    
+    # Only the first worker to get here completes the campaign
+    frappe.db.sql("""
+        update `tabFlashChat Campaign`
+        set status = 'Completed',
+            success_rate = case
+                when coalesce(total_recipients, 0) > coalesce(duplicates_removed, 0)
+                    then coalesce(messages_sent, 0) * 100.0 / (total_recipients - coalesce(duplicates_removed, 0))
+                when coalesce(processed_recipients, 0) > coalesce(duplicates_removed, 0)
+                    then coalesce(messages_sent, 0) * 100.0 / (processed_recipients - coalesce(duplicates_removed, 0))
+                else 0 end,
+            last_progress_at = %(now)s,
+            estimated_completion = %(now)s
+        where name = %(campaign)s and status = 'Processing'
+    """, {"campaign": campaign_name, "now": now()})
+    frappe.db.commit()
+    
+    get_campaign_deduper(campaign_name).clear()
+
+def mark_campaign_failed(campaign_name, error):
+    """Update campaign status to failed, keeping progress so far"""
+    frappe.db.rollback()
+    frappe.db.set_value("FlashChat Campaign", campaign_name, "status", "Failed", update_modified=False)
+    frappe.db.commit()
+    
+    frappe.log_error(f"Campaign processing failed: {str(error)}", "FlashChat Campaign Processing")
+
+def save_campaign_progress(campaign_name, values):
+    """Save and commit campaign progress, so it survives the job stopping"""
+    values["last_progress_at"] = now()
+    frappe.db.set_value("FlashChat Campaign", campaign_name, values, update_modified=False)
+    frappe.db.commit()
+
+def resume_stalled_campaigns():
+    """Queue Processing campaigns again if their job stopped making progress"""
+    cutoff = add_to_date(now(), minutes=-CAMPAIGN_STALL_MINUTES)
+    campaigns = frappe.db.sql_list("""
+        select name from `tabFlashChat Campaign`
+        where status = 'Processing' and coalesce(last_progress_at, modified) < %s
+    """, cutoff)
+    
+    for campaign_name in campaigns:
+        # Mark progress now so the campaign is not queued again before the job starts
+        save_campaign_progress(campaign_name, {})
+        enqueue_campaign(campaign_name)
+
+def get_campaign_context(campaign):
+    """Get context values shared by every recipient of a campaign"""
+    return {
+        'campaign_name': campaign.campaign_name,
+        'company_name': frappe.defaults.get_user_default('Company') or 'Your Company',
+        'date': format_date(now(), 'dd/MM/yyyy')
+    }
+
+def add_name_range(filters, after=None, upto=None):
+    """Limit dict or list filters to recipients named after `after`, up to and including `upto`"""
+    conditions = []
+    if after:
+        conditions.append(["name", ">", after])
+    if upto:
+        conditions.append(["name", "<=", upto])
+    
+    if not conditions:
+        return filters
+    
+    if isinstance(filters, dict):
+        filters = [
+            [field] + list(value) if isinstance(value, (list, tuple)) else [field, "=", value]
+            for field, value in filters.items()
+        ]
+    
+    return list(filters) + conditions
+
+def get_recipient_query(campaign):
+    """Get the doctype, filters and fields to read recipients for campaign"""
+    return get_audience_query(campaign)
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_to_date, cint, now
+
+# How long a worker may hold a chunk before another worker can claim it
+CHUNK_LEASE_MINUTES = 15
+
+# A chunk is given up as failed after this many claims
+MAX_CHUNK_ATTEMPTS = 3
+
+class FlashChatCampaignChunk(Document):
+    pass
+
+def on_doctype_update():
+    """Index chunks the way workers claim them: by campaign and status, in chunk order"""
+    frappe.db.add_index("FlashChat Campaign Chunk", ["campaign", "status", "chunk_index"])
+
+def create_chunk(campaign_name, chunk_index, start_after, end_at, recipient_count):
+    """Record a range of campaign recipients as a chunk to be claimed by workers"""
+    chunk = frappe.get_doc({
+        "doctype": "FlashChat Campaign Chunk",
+        "campaign": campaign_name,
+        "chunk_index": chunk_index,
+        "status": "Pending",
+        "start_after": start_after,
+        "end_at": end_at,
+        "recipient_count": recipient_count
+    })
+    chunk.insert(ignore_permissions=True)
+    return chunk
+
+def claim_chunk(campaign_name, owner):
+    """Lease the next due pending or expired chunk of a campaign to `owner`
+    
+    The claim is a conditional UPDATE committed straight away, so when several
+    workers race for the same chunk exactly one of them gets it. Returns the
+    chunk, or None when nothing is left to claim.
+    """
+    fail_exhausted_chunks(campaign_name)
+    
+    current = now()
+    candidates = frappe.db.sql_list("""
+        select name from `tabFlashChat Campaign Chunk`
+        where campaign = %(campaign)s and attempts < %(max_attempts)s
+            and (status = 'Pending' or (status = 'Leased' and lease_expires < %(now)s))
+            and (not_before is null or not_before <= %(now)s)
+        order by chunk_index
+        limit 10
+    """, {"campaign": campaign_name, "max_attempts": MAX_CHUNK_ATTEMPTS, "now": current})
+    
+    for name in candidates:
+        frappe.db.sql("""
+            update `tabFlashChat Campaign Chunk`
+            set status = 'Leased', lease_owner = %(owner)s, lease_expires = %(expires)s,
+                attempts = coalesce(attempts, 0) + 1
+            where name = %(name)s and attempts < %(max_attempts)s
+                and (status = 'Pending' or (status = 'Leased' and lease_expires < %(now)s))
+                and (not_before is null or not_before <= %(now)s)
+        """, {
+            "name": name,
+            "owner": owner,
+            "expires": add_to_date(current, minutes=CHUNK_LEASE_MINUTES),
+            "max_attempts": MAX_CHUNK_ATTEMPTS,
+            "now": current
+        })
+        frappe.db.commit()
+        
+        chunk = frappe.get_doc("FlashChat Campaign Chunk", name)
+        if chunk.status == "Leased" and chunk.lease_owner == owner:
+            return chunk
+    
+    return None
+
+def checkpoint_chunk(chunk, owner, last_recipient, sent, failed, duplicates=0):
+    """Record recipients sent or skipped from a leased chunk and renew its lease
+    
+    The chunk's last recipient and the campaign totals are updated in one transaction,
+    so a chunk claimed again after a crash resumes after the last recipient
+    counted. Returns False if the lease was lost to another worker.
+    """
+    frappe.db.sql("""
+        update `tabFlashChat Campaign Chunk`
+        set last_recipient = %(last_recipient)s, lease_expires = %(expires)s,
+            messages_sent = coalesce(messages_sent, 0) + %(sent)s,
+            messages_failed = coalesce(messages_failed, 0) + %(failed)s,
+            duplicates_removed = coalesce(duplicates_removed, 0) + %(duplicates)s
+        where name = %(name)s and status = 'Leased' and lease_owner = %(owner)s
+    """, {
+        "name": chunk.name,
+        "last_recipient": last_recipient,
+        "expires": add_to_date(now(), minutes=CHUNK_LEASE_MINUTES),
+        "sent": sent,
+        "failed": failed,
+        "duplicates": duplicates,
+        "owner": owner
+    })
+    
+    if not _holds_lease(chunk, owner, "Leased"):
+        frappe.db.rollback()
+        return False
+    
+    _add_campaign_results(chunk.campaign, sent, failed, duplicates)
+    frappe.db.commit()
+    
+    chunk.last_recipient = last_recipient
+    chunk.messages_sent = cint(chunk.messages_sent) + sent
+    chunk.messages_failed = cint(chunk.messages_failed) + failed
+    chunk.duplicates_removed = cint(chunk.duplicates_removed) + duplicates
+    return True
+
+def complete_chunk(chunk, owner, sent, failed, status="Completed"):
+    """Close a leased chunk and add its results to the campaign in one transaction
+    
+    Does nothing if the lease expired and another worker claimed the chunk.
+    """
+    frappe.db.sql("""
+        update `tabFlashChat Campaign Chunk`
+        set status = %(status)s, lease_expires = null,
+            messages_sent = coalesce(messages_sent, 0) + %(sent)s,
+            messages_failed = coalesce(messages_failed, 0) + %(failed)s
+        where name = %(name)s and status = 'Leased' and lease_owner = %(owner)s
+    """, {"name": chunk.name, "status": status, "sent": sent, "failed": failed, "owner": owner})
+    
+    if not _holds_lease(chunk, owner, status):
+        frappe.db.rollback()
+        return False
+    
+    _add_campaign_results(chunk.campaign, sent, failed)
+    frappe.db.commit()
+    return True
+
+def defer_chunk(chunk, owner, not_before):
+    """Give a leased chunk back to be claimed again from `not_before`
+    
+    Used when the send rate or rate limit holds a chunk up, so the wait does
+    not count as a failed attempt.
+    """
+    frappe.db.sql("""
+        update `tabFlashChat Campaign Chunk`
+        set status = 'Pending', lease_owner = null, lease_expires = null, not_before = %(not_before)s,
+            attempts = greatest(coalesce(attempts, 0) - 1, 0)
+        where name = %(name)s and status = 'Leased' and lease_owner = %(owner)s
+    """, {"name": chunk.name, "owner": owner, "not_before": not_before})
+    frappe.db.commit()
+
+def release_chunk(chunk, owner):
+    """Give a chunk back after a failed attempt, or fail it once it is out of attempts"""
+    if chunk.attempts >= MAX_CHUNK_ATTEMPTS:
+        return complete_chunk(chunk, owner, 0, get_unsent_count(chunk), status="Failed")
+    
+    frappe.db.sql("""
+        update `tabFlashChat Campaign Chunk`
+        set status = 'Pending', lease_owner = null, lease_expires = null
+        where name = %(name)s and status = 'Leased' and lease_owner = %(owner)s
+    """, {"name": chunk.name, "owner": owner})
+    frappe.db.commit()
+    return True
+
+def fail_exhausted_chunks(campaign_name):
+    """Fail chunks whose final lease expired, e.g. because the worker died"""
+    chunks = frappe.get_all(
+        "FlashChat Campaign Chunk",
+        filters={
+            "campaign": campaign_name,
+            "status": "Leased",
+            "lease_expires": ["<", now()],
+            "attempts": [">=", MAX_CHUNK_ATTEMPTS]
+        },
+        fields=["name", "campaign", "lease_owner", "recipient_count", "messages_sent", "messages_failed", "duplicates_removed"]
+    )
+    
+    for chunk in chunks:
+        complete_chunk(chunk, chunk.lease_owner, 0, get_unsent_count(chunk), status="Failed")
+
+def has_open_chunks(campaign_name):
+    """Check whether any chunk of a campaign is still waiting or being sent"""
+    return bool(frappe.db.exists(
+        "FlashChat Campaign Chunk",
+        {"campaign": campaign_name, "status": ["in", ["Pending", "Leased"]]}
+    ))
+
+def get_due_campaigns():
+    """Get Processing campaigns with chunks due to be sent but no worker holding a lease"""
+    current = now()
+    return frappe.db.sql_list("""
+        select distinct chunk.campaign
+        from `tabFlashChat Campaign Chunk` chunk
+        inner join `tabFlashChat Campaign` campaign on campaign.name = chunk.campaign
+        where campaign.status = 'Processing' and chunk.status = 'Pending'
+            and (chunk.not_before is null or chunk.not_before <= %(now)s)
+            and not exists (
+                select 1 from `tabFlashChat Campaign Chunk` leased
+                where leased.campaign = chunk.campaign and leased.status = 'Leased'
+                    and leased.lease_expires >= %(now)s
+            )
+    """, {"now": current})
+
+def get_unsent_count(chunk):
+    """Recipients of a chunk not yet counted as sent, failed or duplicate"""
+    counted = cint(chunk.messages_sent) + cint(chunk.messages_failed) + cint(chunk.duplicates_removed)
+    return max(cint(chunk.recipient_count) - counted, 0)
+
+def _holds_lease(chunk, owner, status):
+    row = frappe.db.get_value("FlashChat Campaign Chunk", chunk.name, ["status", "lease_owner"], as_dict=True)
+    return bool(row) and row.status == status and row.lease_owner == owner
+
+def _add_campaign_results(campaign_name, sent, failed, duplicates=0):
+    # Add to the campaign totals in SQL, so concurrent workers never overwrite each other
+    if not sent and not failed and not duplicates:
+        return
+    
+    frappe.db.sql("""
+        update `tabFlashChat Campaign`
+        set messages_sent = coalesce(messages_sent, 0) + %(sent)s,
+            messages_failed = coalesce(messages_failed, 0) + %(failed)s,
+            duplicates_removed = coalesce(duplicates_removed, 0) + %(duplicates)s,
+            processed_recipients = coalesce(processed_recipients, 0) + %(processed)s,
+            last_progress_at = %(now)s
+        where name = %(campaign)s
+    """, {
+        "campaign": campaign_name,
+        "sent": sent,
+        "failed": failed,
+        "duplicates": duplicates,
+        "processed": sent + failed + duplicates,
+        "now": now()
+    })
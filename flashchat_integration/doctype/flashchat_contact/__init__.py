@@ -1,5 +1,5 @@
-### flashchat_integration/flashchat_contact/__init__.py
-
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-
+### flashchat_integration/flashchat_contact/__init__.py
+
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+
+class FlashChatDailyStats(Document):
+    pass
+
+def on_doctype_update():
+    """One row per day, log type, message type and status, read by date range for each log type"""
+    frappe.db.add_unique(
+        "FlashChat Daily Stats",
+        ["log_type", "stats_date", "message_type", "status"],
+        constraint_name="unique_stats_key"
+    )
@@ -1,75 +1,160 @@
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-import frappe
-from frappe.model.document import Document
-from frappe.utils import now, format_datetime
-
-class FlashChatMessageLog(Document):
-    def validate(self):
-        """Validate message log"""
-        self.validate_phone_number()
-        self.set_timestamps()
-    
-    def validate_phone_number(self):
-        """Validate phone number format"""
-        if self.phone_number and not self.phone_number.startswith('+'):
-            frappe.throw("Phone number must be in international format (+country code)")
-    
-    def set_timestamps(self):
-        """Set timestamps"""
-        if not self.sent_at and self.status in ['Sent', 'Delivered', 'Read']:
-            self.sent_at = now()
-        
-        if not self.received_at and self.status == 'Received':
-            self.received_at = now()
-    
-    def retry_send(self):
-        """Retry sending failed message"""
-        if self.status != 'Failed':
-            frappe.throw("Only failed messages can be retried")
-        
-        try:
-            from flashchat_integration.api import FlashChatAPI
-            api = FlashChatAPI()
-            
-            if self.message_type == 'SMS':
-                result = api.send_sms(
-                    phone=self.phone_number,
-                    message=self.message_content,
-                    reference_doctype=self.reference_doctype,
-                    reference_name=self.reference_name
-                )
-            elif self.message_type == 'WhatsApp':
-                # Get WhatsApp account
-                accounts = api.get_whatsapp_accounts()
-                if accounts.get("success") and accounts.get("accounts"):
-                    account_id = accounts["accounts"][0]["id"]
-                    result = api.send_whatsapp(
-                        account=account_id,
-                        recipient=self.phone_number,
-                        message=self.message_content,
-                        reference_doctype=self.reference_doctype,
-                        reference_name=self.reference_name
-                    )
-                else:
-                    frappe.throw("No WhatsApp accounts available")
-            
-            # Update this record
-            self.status = 'Sent'
-            self.retry_count += 1
-            self.error_message = None
-            self.save()
-            
-            return {"success": True, "message": "Message resent successfully"}
-            
-        except Exception as e:
-            self.retry_count += 1
-            self.error_message = str(e)
-            self.save()
-            return {"success": False, "error": str(e)}
-
-@frappe.whitelist()
-def retry_message(name):
-    """Retry sending a message"""
-    doc = frappe.get_doc("FlashChat Message Log", name)
-    return doc.retry_send()
\ No newline at end of file
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now, format_datetime, add_to_date
+import time
+
+from flashchat_integration.daily_stats import record_change, record_logs
+
+# Index name -> columns. Single column indexes are named like Frappe's
+# search_index indexes, so schema sync sees them as already present.
+MESSAGE_LOG_INDEXES = {
+    "flashchat_message_id": ["flashchat_message_id"],
+    "phone_number": ["phone_number"],
+    "sent_at": ["sent_at"],
+    "message_type_sent_at_status": ["message_type", "sent_at", "status"],
+    "status_sent_at": ["status", "sent_at"],
+    "reference_doctype_reference_name": ["reference_doctype", "reference_name"]
+}
+
+class FlashChatMessageLog(Document):
+    def validate(self):
+        """Validate message log"""
+        self.validate_phone_number()
+        self.set_timestamps()
+    
+    def after_insert(self):
+        record_logs(self.doctype, [self])
+    
+    def on_update(self):
+        """Move this log between daily counts if its date, type or status changed"""
+        before = self.get_doc_before_save()
+        if before:
+            record_change(self.doctype, before, self)
+    
+    def validate_phone_number(self):
+        """Validate phone number format"""
+        if self.phone_number and not self.phone_number.startswith('+'):
+            frappe.throw("Phone number must be in international format (+country code)")
+    
+    def set_timestamps(self):
+        """Set timestamps"""
+        if not self.sent_at and self.status in ['Sent', 'Delivered', 'Read']:
+            self.sent_at = now()
+        
+        if not self.received_at and self.status == 'Received':
+            self.received_at = now()
+    
+    def retry_send(self):
+        """Retry sending failed message"""
+        if self.status != 'Failed':
+            frappe.throw("Only failed messages can be retried")
+        
+        try:
+            from flashchat_integration.api import FlashChatAPI
+            from flashchat_integration.whatsapp_accounts import select_account
+            api = FlashChatAPI()
+            
+            if self.message_type == 'SMS':
+                result = api.send_sms(
+                    phone=self.phone_number,
+                    message=self.message_content,
+                    reference_doctype=self.reference_doctype,
+                    reference_name=self.reference_name
+                )
+            elif self.message_type == 'WhatsApp':
+                # Get WhatsApp account
+                account_id = select_account(api)
+                if account_id:
+                    result = api.send_whatsapp(
+                        account=account_id,
+                        recipient=self.phone_number,
+                        message=self.message_content,
+                        reference_doctype=self.reference_doctype,
+                        reference_name=self.reference_name
+                    )
+                else:
+                    frappe.throw("No WhatsApp accounts available")
+            
+            # Update this record
+            self.status = 'Sent'
+            self.retry_count += 1
+            self.error_message = None
+            self.save()
+            
+            return {"success": True, "message": "Message resent successfully"}
+            
+        except Exception as e:
+            self.retry_count += 1
+            self.error_message = str(e)
+            self.save()
+            return {"success": False, "error": str(e)}
+
+@frappe.whitelist()
+def retry_message(name):
+    """Retry sending a message"""
+    doc = frappe.get_doc("FlashChat Message Log", name)
+    return doc.retry_send()
+
+def on_doctype_update():
+    """Add the indexes the hot Message Log queries rely on"""
+    add_message_log_indexes()
+
+def add_message_log_indexes():
+    """Create missing Message Log indexes with online DDL
+    
+    ALGORITHM=INPLACE, LOCK=NONE builds each index while the table keeps
+    taking reads and writes, so large existing logs are not locked for the
+    length of the build.
+    """
+    for index_name, columns in MESSAGE_LOG_INDEXES.items():
+        if frappe.db.sql("show index from `tabFlashChat Message Log` where Key_name = %s", index_name):
+            continue
+        
+        column_list = ", ".join(f"`{column}`" for column in columns)
+        frappe.db.sql_ddl(
+            f"alter table `tabFlashChat Message Log` add index `{index_name}` ({column_list}), "
+            "algorithm=inplace, lock=none"
+        )
+
+def explain_hot_queries():
+    """Show the plan and run time of each hot Message Log query
+    
+    Run before and after adding the indexes to compare, e.g.
+    bench --site <site> execute flashchat_integration.doctype.flashchat_message_log.flashchat_message_log.explain_hot_queries
+    """
+    hour_ago = add_to_date(now(), hours=-1)
+    queries = {
+        "webhook lookup": ("select name from `tabFlashChat Message Log` where flashchat_message_id = %s", ["0"]),
+        "rate limit count": (
+            "select count(*) from `tabFlashChat Message Log` "
+            "where message_type = %s and sent_at >= %s and status in ('Sent', 'Delivered')",
+            ["SMS", hour_ago]
+        ),
+        "phone dashboard count": ("select count(*) from `tabFlashChat Message Log` where phone_number = %s", ["+0"]),
+        "reference dashboard count": (
+            "select count(*) from `tabFlashChat Message Log` where reference_doctype = %s and reference_name = %s",
+            ["Sales Order", "0"]
+        ),
+        "status sync": (
+            "select name from `tabFlashChat Message Log` where status = 'Sent' and sent_at >= %s",
+            [hour_ago]
+        ),
+        "retention delete scan": ("select count(*) from `tabFlashChat Message Log` where sent_at < %s", ["2000-01-01"])
+    }
+    
+    results = []
+    for label, (query, values) in queries.items():
+        plan = frappe.db.sql(f"explain {query}", values, as_dict=True)
+        started = time.monotonic()
+        frappe.db.sql(query, values)
+        results.append({
+            "query": label,
+            "key": plan[0].get("key") if plan else None,
+            "type": plan[0].get("type") if plan else None,
+            "rows": plan[0].get("rows") if plan else None,
+            "seconds": round(time.monotonic() - started, 4)
+        })
+    
+    return results
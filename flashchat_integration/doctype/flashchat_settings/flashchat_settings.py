@@ -1,27 +1,46 @@
-
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-import frappe
-from frappe.model.document import Document
-from frappe.utils import get_url
-
-class FlashChatSettings(Document):
-    def validate(self):
-        """Validate FlashChat settings"""
-        self.validate_api_secret()
-        self.set_webhook_url()
-    
-    def validate_api_secret(self):
-        """Validate API secret is provided"""
-        if not self.api_secret:
-            frappe.throw("API Secret is required")
-    
-    def set_webhook_url(self):
-        """Set webhook URL automatically"""
-        if self.enable_webhooks:
-            site_url = get_url()
-            self.webhook_url = f"{site_url}/api/method/flashchat_integration.api.flashchat_webhook"
-    
-    def on_update(self):
-        """Clear cache when settings are updated"""
-        frappe.cache().delete_value("flashchat_settings")
+
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+from frappe.utils import get_url
+from flashchat_integration.cache import get_cached, invalidate
+
+SETTINGS_CACHE_KEY = "flashchat_settings"
+
+class FlashChatSettings(Document):
+    def validate(self):
+        """Validate FlashChat settings"""
+        self.validate_api_secret()
+        self.set_webhook_url()
+    
+    def validate_api_secret(self):
+        """Validate API secret is provided"""
+        if not self.api_secret:
+            frappe.throw("API Secret is required")
+    
+    def set_webhook_url(self):
+        """Set webhook URL automatically"""
+        if self.enable_webhooks:
+            site_url = get_url()
+            self.webhook_url = f"{site_url}/api/method/flashchat_integration.api.flashchat_webhook"
+    
+    def on_update(self):
+        """Clear cache when settings are updated"""
+        clear_settings_cache()
+
+def get_settings():
+    """Get a process-cached snapshot of FlashChat Settings with passwords decrypted"""
+    return get_cached(SETTINGS_CACHE_KEY, load_settings)
+
+def load_settings():
+    """Load FlashChat Settings from the database"""
+    doc = frappe.get_single("FlashChat Settings")
+    settings = frappe._dict(doc.as_dict(no_default_fields=True))
+    settings.api_secret = doc.get_password("api_secret", raise_exception=False)
+    settings.webhook_secret = doc.get_password("webhook_secret", raise_exception=False)
+    return settings
+
+def clear_settings_cache():
+    """Invalidate the cached settings snapshot in every worker"""
+    invalidate(SETTINGS_CACHE_KEY)
@@ -1,8 +1,11 @@
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-import frappe
-from frappe.model.document import Document
-
-class FlashChatWorkflowLog(Document):
-    pass
-
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+
+from flashchat_integration.daily_stats import record_logs
+
+class FlashChatWorkflowLog(Document):
+    def after_insert(self):
+        record_logs(self.doctype, [self])
+
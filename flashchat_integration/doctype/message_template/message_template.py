@@ -1,133 +1,161 @@
-
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-import frappe
-from frappe.model.document import Document
-from frappe.utils import now, format_date, format_datetime
-import re
-import json
-
-class MessageTemplate(Document):
-    def validate(self):
-        """Validate message template"""
-        self.validate_template_variables()
-        self.set_created_by()
-    
-    def validate_template_variables(self):
-        """Validate that all variables in template are supported"""
-        if not self.template_content:
-            return
-        
-        # Extract variables from template content
-        variables = re.findall(r'\{([^}]+)\}', self.template_content)
-        
-        # Get available variables
-        try:
-            available_vars = json.loads(self.available_variables or '{}')
-            available_var_names = list(available_vars.keys())
-        except:
-            available_var_names = []
-        
-        # Check for unsupported variables
-        unsupported = [var for var in variables if var not in available_var_names]
-        
-        if unsupported:
-            frappe.throw(
-                f"Unsupported variables found: {', '.join(unsupported)}. "
-                f"Available variables: {', '.join(available_var_names)}"
-            )
-    
-    def set_created_by(self):
-        """Set created by field"""
-        if not self.created_by:
-            self.created_by = frappe.session.user
-    
-    def render_template(self, context=None):
-        """Render template with provided context"""
-        if not context:
-            context = {}
-        
-        content = self.template_content
-        
-        # Add default context values
-        default_context = {
-            'company_name': frappe.defaults.get_user_default('Company') or 'Your Company',
-            'date': format_date(now(), 'dd/MM/yyyy'),
-            'datetime': format_datetime(now(), 'dd/MM/yyyy HH:mm')
-        }
-        
-        # Merge contexts
-        render_context = {**default_context, **context}
-        
-        # Replace variables in template
-        for key, value in render_context.items():
-            if value is not None:
-                content = content.replace(f'{{{key}}}', str(value))
-        
-        # Update usage statistics
-        self.update_usage_stats()
-        
-        return content
-    
-    def update_usage_stats(self):
-        """Update usage statistics"""
-        frappe.db.set_value(
-            'Message Template', 
-            self.name, 
-            {
-                'usage_count': (self.usage_count or 0) + 1,
-                'last_used': now()
-            },
-            update_modified=False
-        )
-    
-    def get_preview(self, context=None):
-        """Get template preview with sample data"""
-        sample_context = {
-            'customer_name': 'John Doe',
-            'order_id': 'SO-2025-00001',
-            'amount': '1,500.00',
-            'company_name': 'ABC Company',
-            'date': format_date(now(), 'dd/MM/yyyy'),
-            'due_date': format_date(now(), 'dd/MM/yyyy'),
-            'invoice_number': 'INV-2025-00001'
-        }
-        
-        if context:
-            sample_context.update(context)
-        
-        return self.render_template(sample_context)
-
-@frappe.whitelist()
-def get_template_preview(template_name, context=None):
-    """Get template preview"""
-    try:
-        template = frappe.get_doc('Message Template', template_name)
-        if context and isinstance(context, str):
-            context = json.loads(context)
-        return {
-            'success': True,
-            'preview': template.get_preview(context)
-        }
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e)
-        }
-
-@frappe.whitelist()
-def render_template(template_name, context):
-    """Render template with context"""
-    try:
-        template = frappe.get_doc('Message Template', template_name)
-        if isinstance(context, str):
-            context = json.loads(context)
-        return {
-            'success': True,
-            'rendered': template.render_template(context)
-        }
-    except Exception as e:
-        return {
-            'success': False,
-            'error': str(e)
-        }
+
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now, format_date, format_datetime
+import re
+import json
+from collections import ChainMap
+from flashchat_integration.counters import template_usage
+from flashchat_integration.template_engine import LazyContext, compile_template, format_now, get_company_name
+
+class MessageTemplate(Document):
+    def onload(self):
+        """Include usage not yet written by the counter flush"""
+        template_usage.apply_pending(self)
+    
+    def validate(self):
+        """Validate message template"""
+        self.validate_template_variables()
+        self.set_created_by()
+        self.keep_usage_stats()
+    
+    def validate_template_variables(self):
+        """Validate that all variables in template are supported"""
+        if not self.template_content:
+            return
+        
+        # Extract variables from template content
+        variables = re.findall(r'\{([^}]+)\}', self.template_content)
+        
+        # Get available variables
+        try:
+            available_vars = json.loads(self.available_variables or '{}')
+            available_var_names = list(available_vars.keys())
+        except:
+            available_var_names = []
+        
+        # Check for unsupported variables
+        unsupported = [var for var in variables if var not in available_var_names]
+        
+        if unsupported:
+            frappe.throw(
+                f"Unsupported variables found: {', '.join(unsupported)}. "
+                f"Available variables: {', '.join(available_var_names)}"
+            )
+    
+    def keep_usage_stats(self):
+        """Keep usage statistics as stored, since they are only updated by counter flushes"""
+        if not self.is_new():
+            self.usage_count, self.last_used = frappe.db.get_value(
+                'Message Template', self.name, ['usage_count', 'last_used']
+            )
+    
+    def set_created_by(self):
+        """Set created by field"""
+        if not self.created_by:
+            self.created_by = frappe.session.user
+    
+    def render_template(self, context=None):
+        """Render template with provided context"""
+        if context is None:
+            context = {}
+        
+        # Merge contexts, computing defaults only if the template uses them
+        render_context = ChainMap(context, self.get_default_context())
+        
+        content = compile_template(self.template_content).render(render_context)
+        
+        # Update usage statistics
+        self.update_usage_stats()
+        
+        return content
+    
+    def render_many(self, contexts):
+        """Render template once per context, compiling it only once"""
+        rendered = compile_template(self.template_content).render_many(contexts, self.get_default_context())
+        
+        if rendered:
+            self.update_usage_stats(len(rendered))
+        
+        return rendered
+    
+    def get_default_context(self):
+        """Get default context values, computed on first use"""
+        return LazyContext(computed={
+            'company_name': get_company_name,
+            'date': lambda: format_now(format_date, 'dd/MM/yyyy'),
+            'datetime': lambda: format_now(format_datetime, 'dd/MM/yyyy HH:mm')
+        })
+    
+    def update_usage_stats(self, count=1):
+        """Update usage statistics
+        
+        Increments are buffered in Redis and written by a scheduled flush, so
+        concurrent renders do not queue on this template's row lock.
+        """
+        template_usage.increment(self.name, {'usage_count': count}, {'last_used': now()})
+    
+    def get_preview(self, context=None):
+        """Get template preview with sample data"""
+        sample_context = {
+            'customer_name': 'John Doe',
+            'order_id': 'SO-2025-00001',
+            'amount': '1,500.00',
+            'company_name': 'ABC Company',
+            'date': format_date(now(), 'dd/MM/yyyy'),
+            'due_date': format_date(now(), 'dd/MM/yyyy'),
+            'invoice_number': 'INV-2025-00001'
+        }
+        
+        if context:
+            sample_context.update(context)
+        
+        return self.render_template(sample_context)
+
+@frappe.whitelist()
+def get_template_preview(template_name, context=None):
+    """Get template preview"""
+    try:
+        template = frappe.get_doc('Message Template', template_name)
+        if context and isinstance(context, str):
+            context = json.loads(context)
+        return {
+            'success': True,
+            'preview': template.get_preview(context)
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
+
+@frappe.whitelist()
+def get_usage_stats(template_name):
+    """Get template usage including increments not yet written to the database"""
+    usage_count, last_used = frappe.db.get_value(
+        'Message Template', template_name, ['usage_count', 'last_used']
+    )
+    pending = template_usage.get_pending(template_name)
+    return {
+        'usage_count': (usage_count or 0) + pending['usage_count'],
+        'last_used': pending.get('last_used') or last_used
+    }
+
+@frappe.whitelist()
+def render_template(template_name, context):
+    """Render template with context"""
+    try:
+        template = frappe.get_doc('Message Template', template_name)
+        if isinstance(context, str):
+            context = json.loads(context)
+        return {
+            'success': True,
+            'rendered': template.render_template(context)
+        }
+    except Exception as e:
+        return {
+            'success': False,
+            'error': str(e)
+        }
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import gzip
+import hashlib
+import json
+import os
+
+import frappe
+from frappe.utils import add_to_date, now, now_datetime
+
+# Tables exported by backup_message_data, each with its own high-water mark. Message
+# logs are only archived once exported, so the archive table needs no export of its own.
+EXPORT_DOCTYPES = ["FlashChat Message Log", "FlashChat Workflow Log"]
+
+# Rows changed this recently are left for the next run, so transactions still open are not skipped
+EXPORT_LAG_MINUTES = 5
+
+# Bytes read at a time when checksumming a finished file
+CHECKSUM_BLOCK_SIZE = 1024 * 1024
+
+def export_changes():
+    """Export every row changed since the last run to gzipped NDJSON and write a manifest
+    
+    Each table is read in (modified, name) order through an unbuffered cursor
+    and written line by line, so memory use does not grow with the number of
+    rows. A table's high-water mark only moves once its file is complete, so a
+    failed run is redone in full by the next one. Returns the manifest.
+    """
+    until = add_to_date(now(), minutes=-EXPORT_LAG_MINUTES)
+    stamp = now_datetime().strftime("%Y%m%d%H%M%S")
+    directory = get_export_directory()
+    
+    files = []
+    for doctype in EXPORT_DOCTYPES:
+        export = export_doctype(doctype, until, directory, stamp)
+        if export:
+            files.append(export)
+    
+    manifest = {
+        "created": now(),
+        "until": str(until),
+        "files": files
+    }
+    
+    if files:
+        _write_atomic(os.path.join(directory, f"manifest-{stamp}.json"), json.dumps(manifest, indent=1).encode())
+        for export in files:
+            set_high_water_mark(export["doctype"], export["high_water_mark"])
+        frappe.db.commit()
+    
+    frappe.logger("flashchat_integration").info(
+        f"Message data export: {[(export['doctype'], export['rows']) for export in files]}"
+    )
+    return manifest
+
+def export_doctype(doctype, until, directory, stamp):
+    """Write rows of `doctype` changed after its high-water mark and up to `until` to one file
+    
+    Returns the file's manifest entry, or None if nothing changed.
+    """
+    after = get_high_water_mark(doctype)
+    filename = f"{frappe.scrub(doctype)}-{stamp}.ndjson.gz"
+    path = os.path.join(directory, filename)
+    partial = f"{path}.partial"
+    
+    rows = 0
+    last = None
+    
+    try:
+        with gzip.open(partial, "wt", encoding="utf-8") as f, frappe.db.unbuffered_cursor():
+            for row in frappe.db.sql(f"""
+                select * from `tab{doctype}`
+                where (modified > %(modified)s or (modified = %(modified)s and name > %(name)s))
+                    and modified <= %(until)s
+                order by modified, name
+            """, {"modified": after["modified"], "name": after["name"], "until": until}, as_dict=True, as_iterator=True):
+                f.write(json.dumps(row, default=str, separators=(",", ":")))
+                f.write("\n")
+                rows += 1
+                last = row
+    except Exception:
+        _remove(partial)
+        raise
+    
+    if not rows:
+        _remove(partial)
+        return None
+    
+    _fsync(partial)
+    os.replace(partial, path)
+    
+    return {
+        "doctype": doctype,
+        "file": filename,
+        "rows": rows,
+        "bytes": os.path.getsize(path),
+        "sha256": get_checksum(path),
+        "after": after,
+        "high_water_mark": {"modified": str(last["modified"]), "name": last["name"]}
+    }
+
+def get_export_directory():
+    directory = frappe.get_site_path("private", "backups", "flashchat")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+def get_high_water_mark(doctype):
+    """Get the (modified, name) of the last row exported from `doctype`"""
+    value = frappe.db.get_global(_high_water_mark_key(doctype))
+    if value:
+        return json.loads(value)
+    return {"modified": "1900-01-01 00:00:00", "name": ""}
+
+def set_high_water_mark(doctype, mark):
+    frappe.db.set_global(_high_water_mark_key(doctype), json.dumps(mark))
+
+def get_checksum(path):
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHECKSUM_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _high_water_mark_key(doctype):
+    return f"flashchat_export:{frappe.scrub(doctype)}"
+
+def _write_atomic(path, content):
+    partial = f"{path}.partial"
+    with open(partial, "wb") as f:
+        f.write(content)
+    _fsync(partial)
+    os.replace(partial, path)
+
+def _fsync(path):
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+def _remove(path):
+    if os.path.exists(path):
+        os.remove(path)
@@ -127,10 +127,14 @@ doc_events = {
         ],
         "on_update": [
             "flashchat_integration.utils.sync_contact_to_flashchat",
-            "flashchat_integration.utils.update_flashchat_contact"
+            "flashchat_integration.utils.update_flashchat_contact",
+            "flashchat_integration.utils.update_audience_member"
         ],
         "validate": "flashchat_integration.utils.validate_contact_phone",
-        "on_trash": "flashchat_integration.utils.cleanup_contact_data"
+        "on_trash": [
+            "flashchat_integration.utils.cleanup_contact_data",
+            "flashchat_integration.utils.remove_audience_member"
+        ]
     },
     
     # Customer specific events
@@ -139,8 +143,12 @@ doc_events = {
             "flashchat_integration.utils.sync_customer_to_flashchat",
             "flashchat_integration.utils.create_customer_preferences"
         ],
-        "on_update": "flashchat_integration.utils.sync_customer_to_flashchat",
-        "validate": "flashchat_integration.utils.validate_customer_phone"
+        "on_update": [
+            "flashchat_integration.utils.sync_customer_to_flashchat",
+            "flashchat_integration.utils.update_audience_member"
+        ],
+        "validate": "flashchat_integration.utils.validate_customer_phone",
+        "on_trash": "flashchat_integration.utils.remove_audience_member"
     },
     
     # Lead specific events
@@ -149,8 +157,12 @@ doc_events = {
             "flashchat_integration.utils.sync_lead_to_flashchat",
             "flashchat_integration.utils.auto_lead_followup"
         ],
-        "on_update": "flashchat_integration.utils.sync_lead_to_flashchat",
-        "validate": "flashchat_integration.utils.validate_lead_phone"
+        "on_update": [
+            "flashchat_integration.utils.sync_lead_to_flashchat",
+            "flashchat_integration.utils.update_audience_member"
+        ],
+        "validate": "flashchat_integration.utils.validate_lead_phone",
+        "on_trash": "flashchat_integration.utils.remove_audience_member"
     },
     
     # Sales Order events
@@ -222,7 +234,8 @@ doc_events = {
     
     "FlashChat Workflow": {
         "validate": "flashchat_integration.utils.validate_workflow_config",
-        "on_update": "flashchat_integration.utils.update_workflow_hooks"
+        "on_update": "flashchat_integration.utils.update_workflow_hooks",
+        "on_trash": "flashchat_integration.utils.update_workflow_hooks"
     },
     
     "FlashChat Campaign": {
@@ -240,11 +253,17 @@ doc_events = {
 # ---------------
 
 scheduler_events = {
-    # Every 15 minutes
     "cron": {
+        # Every minute
+        "* * * * *": [
+            "flashchat_integration.counters.flush_all",
+            "flashchat_integration.doctype.flashchat_campaign.flashchat_campaign.dispatch_due_campaigns"
+        ],
+        # Every 15 minutes
         "*/15 * * * *": [
             "flashchat_integration.utils.process_pending_messages",
-            "flashchat_integration.utils.sync_message_status"
+            "flashchat_integration.utils.sync_message_status",
+            "flashchat_integration.doctype.flashchat_campaign.flashchat_campaign.resume_stalled_campaigns"
         ],
         "*/30 * * * *": [
             "flashchat_integration.utils.check_rate_limits",
@@ -270,21 +289,23 @@ scheduler_events = {
     
     # Daily tasks
     "daily": [
-        "flashchat_integration.utils.cleanup_old_logs",
-        "flashchat_integration.utils.cleanup_workflow_logs",
         "flashchat_integration.utils.send_daily_summary",
         "flashchat_integration.utils.check_overdue_invoices",
         "flashchat_integration.utils.process_anniversary_reminders",
         "flashchat_integration.utils.update_contact_preferences",
         "flashchat_integration.utils.validate_phone_numbers",
-        "flashchat_integration.utils.archive_old_campaigns"
+        "flashchat_integration.utils.archive_old_campaigns",
+        "flashchat_integration.daily_stats.rebuild_recent_stats"
     ],
     
     # Daily long-running tasks
     "daily_long": [
+        "flashchat_integration.utils.cleanup_old_logs",
+        "flashchat_integration.utils.cleanup_workflow_logs",
         "flashchat_integration.utils.full_contact_sync",
         "flashchat_integration.utils.generate_analytics_data",
-        "flashchat_integration.utils.backup_message_data"
+        "flashchat_integration.utils.backup_message_data",
+        "flashchat_integration.utils.archive_old_data"
     ],
     
     # Weekly tasks
@@ -299,9 +320,12 @@ scheduler_events = {
     # Monthly tasks
     "monthly": [
         "flashchat_integration.utils.generate_monthly_analytics",
-        "flashchat_integration.utils.archive_old_data",
-        "flashchat_integration.utils.update_contact_segments",
         "flashchat_integration.utils.review_workflow_performance"
+    ],
+    
+    # Monthly long-running tasks
+    "monthly_long": [
+        "flashchat_integration.utils.update_contact_segments"
     ]
 }
 
@@ -419,6 +443,8 @@ rate_limits = {
     "flashchat_integration.api.send_sms_api": (100, 3600),  # 100 per hour
     "flashchat_integration.api.send_whatsapp_api": (50, 3600),  # 50 per hour
     "flashchat_integration.api.send_otp_api": (20, 3600),  # 20 per hour
+    "flashchat_integration.api.send_sms_batch_api": (10, 3600),  # 10 batches per hour
+    "flashchat_integration.api.send_whatsapp_batch_api": (10, 3600),  # 10 batches per hour
     "flashchat_integration.api.flashchat_webhook": (1000, 3600)  # 1000 per hour
 }
 
@@ -530,6 +556,10 @@ background_jobs = {
     }
 }
 
+# Flush write-behind log buffers once the request or job that filled them is done
+after_request = ["flashchat_integration.log_buffer.flush_all"]
+after_job = ["flashchat_integration.log_buffer.flush_all"]
+
 # Naming Series
 # -------------
 
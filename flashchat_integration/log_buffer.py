@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import atexit
+import threading
+import time
+
+import frappe
+from frappe.utils import cint
+
+from flashchat_integration.bulk import bulk_insert
+
+DEFAULT_MAX_SIZE = 500
+DEFAULT_MAX_AGE = 5
+
+# Every buffer created in this process, flushed together at end of request/job and on exit
+_buffers = []
+
+class LogBuffer:
+    """Write-behind buffer for log doctypes
+    
+    Rows are held per site and written with one multi-row insert and commit when the
+    current request or background job ends. Adding rows never writes them, since the
+    commit would also commit the caller's unfinished transaction. A buffer holding
+    `max_size` rows or a row `max_age` seconds old is due, and long jobs write due
+    buffers with flush_due at points where their own work is committed.
+    """
+    
+    def __init__(self, doctype, naming_series, max_size=DEFAULT_MAX_SIZE, max_age=DEFAULT_MAX_AGE):
+        self.doctype = doctype
+        self.naming_series = naming_series
+        self.max_size = max_size
+        self.max_age = max_age
+        self._rows = {}
+        self._started = {}
+        self._lock = threading.Lock()
+        _buffers.append(self)
+    
+    def add(self, row):
+        self.extend([row])
+    
+    def extend(self, rows):
+        """Queue rows for the current site"""
+        if not rows:
+            return
+        
+        site = frappe.local.site
+        with self._lock:
+            pending = self._rows.setdefault(site, [])
+            if not pending:
+                self._started[site] = time.monotonic()
+            pending.extend(rows)
+    
+    def is_due(self, site=None):
+        """Check whether the buffer holds `max_size` rows or a row older than `max_age` seconds"""
+        site = site or frappe.local.site
+        with self._lock:
+            pending = self._rows.get(site)
+            if not pending:
+                return False
+            return len(pending) >= self.max_size or time.monotonic() - self._started[site] >= self.max_age
+    
+    def pending(self, site=None):
+        return len(self._rows.get(site or frappe.local.site, []))
+    
+    def flush(self):
+        """Write all pending rows for the current site"""
+        site = frappe.local.site
+        with self._lock:
+            rows = self._rows.pop(site, [])
+            self._started.pop(site, None)
+        
+        if not rows:
+            return 0
+        
+        try:
+            # Undo only this flush's partial insert, not the caller's uncommitted work
+            frappe.db.savepoint("flashchat_log_buffer")
+            try:
+                bulk_insert(self.doctype, rows, self.naming_series)
+            except Exception:
+                frappe.db.rollback(save_point="flashchat_log_buffer")
+                raise
+            frappe.db.commit()
+        except Exception:
+            # Put the rows back in front of anything queued since, so they are retried on the next flush
+            with self._lock:
+                pending = self._rows.setdefault(site, [])
+                pending[:0] = rows
+                self._started.setdefault(site, time.monotonic())
+            raise
+        
+        return len(rows)
+    
+    def sites(self):
+        return [site for site, rows in self._rows.items() if rows]
+
+def get_buffer_limits(settings):
+    """Get (max_size, max_age) for buffers from FlashChat Settings"""
+    return (
+        cint(settings.get("log_buffer_size")) or DEFAULT_MAX_SIZE,
+        cint(settings.get("log_flush_interval")) or DEFAULT_MAX_AGE
+    )
+
+def is_buffered(settings):
+    """Check whether logs should be written behind instead of committed per message"""
+    return settings.get("message_log_mode") == "Buffered"
+
+def configure_buffers(settings):
+    """Apply buffer thresholds from FlashChat Settings to every buffer"""
+    max_size, max_age = get_buffer_limits(settings)
+    for buffer in _buffers:
+        buffer.max_size = max_size
+        buffer.max_age = max_age
+
+def flush_all(*args, **kwargs):
+    """Flush every buffer for the current site
+    
+    Registered as an after_request and after_job hook so nothing stays buffered
+    past the end of the request or job that produced it.
+    """
+    if not getattr(frappe.local, "site", None) or not getattr(frappe.local, "db", None):
+        return
+    
+    for buffer in _buffers:
+        try:
+            buffer.flush()
+        except Exception as e:
+            frappe.log_error(f"Failed to write buffered {buffer.doctype} rows: {str(e)}", "FlashChat Log Buffer")
+
+def flush_due():
+    """Flush buffers of the current site that are full or stale
+    
+    Commits, so call it only where the caller's own work has just been
+    committed, such as after a campaign checkpoint.
+    """
+    for buffer in _buffers:
+        if not buffer.is_due():
+            continue
+        try:
+            buffer.flush()
+        except Exception as e:
+            # A failed write never changes the result of the sends being logged
+            frappe.log_error(f"Failed to write buffered {buffer.doctype} rows: {str(e)}", "FlashChat Log Buffer")
+
+def _flush_on_exit():
+    """Flush rows left behind for any site when the worker process shuts down"""
+    sites = {site for buffer in _buffers for site in buffer.sites()}
+    
+    for site in sites:
+        try:
+            frappe.init(site=site)
+            frappe.connect()
+            flush_all()
+        except Exception:
+            pass
+        finally:
+            frappe.destroy()
+
+atexit.register(_flush_on_exit)
+
+message_log_buffer = LogBuffer("FlashChat Message Log", "FCM-.YYYY.-.#####")
+workflow_log_buffer = LogBuffer("FlashChat Workflow Log", "FCW-.YYYY.-.#####")
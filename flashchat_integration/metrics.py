@@ -1,28 +1,28 @@
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-import frappe
-import time
-
-def track_message_delivery_time(start_time, end_time, message_type):
-    """Track message delivery time metrics"""
-    delivery_time = end_time - start_time
-    
-    # Store metrics in a simple way
-    metrics_doc = frappe.get_doc({
-        'doctype': 'FlashChat Metrics',
-        'metric_type': 'Delivery Time',
-        'message_type': message_type,
-        'value': delivery_time,
-        'timestamp': frappe.utils.now()
-    })
-    metrics_doc.insert(ignore_permissions=True)
-
-def track_workflow_execution_time(workflow_name, execution_time):
-    """Track workflow execution time"""
-    # Implementation for workflow metrics
-    pass
-
-def track_api_response_times(endpoint, response_time):
-    """Track API response times"""
-    # Implementation for API metrics
-    pass
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+import time
+
+def track_message_delivery_time(start_time, end_time, message_type):
+    """Track message delivery time metrics"""
+    delivery_time = end_time - start_time
+    
+    # Store metrics in a simple way
+    metrics_doc = frappe.get_doc({
+        'doctype': 'FlashChat Metrics',
+        'metric_type': 'Delivery Time',
+        'message_type': message_type,
+        'value': delivery_time,
+        'timestamp': frappe.utils.now()
+    })
+    metrics_doc.insert(ignore_permissions=True)
+
+def track_workflow_execution_time(workflow_name, execution_time):
+    """Track workflow execution time"""
+    # Implementation for workflow metrics
+    pass
+
+def track_api_response_times(endpoint, response_time):
+    """Track API response times"""
+    # Implementation for API metrics
+    pass
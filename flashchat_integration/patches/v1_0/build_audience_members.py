@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+
+from flashchat_integration.audience import rebuild_audience
+
+def execute():
+    """Fill the campaign audience table from existing Contacts, Customers and Leads"""
+    frappe.reload_doc("flashchat_integration", "doctype", "flashchat_audience_member")
+    rebuild_audience()
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+
+from flashchat_integration.doctype.flashchat_message_log.flashchat_message_log import add_message_log_indexes
+
+def execute():
+    """Index the Message Log columns used by webhooks, rate limits, dashboards and retention"""
+    add_message_log_indexes()
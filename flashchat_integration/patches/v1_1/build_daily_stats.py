@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+
+from flashchat_integration.daily_stats import rebuild_daily_stats
+
+def execute():
+    """Count existing message and workflow logs into the daily stats"""
+    frappe.reload_doc("flashchat_integration", "doctype", "flashchat_daily_stats")
+    rebuild_daily_stats()
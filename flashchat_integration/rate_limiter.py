@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import frappe
+
+# Token bucket refilled continuously at capacity / period tokens per second.
+# Runs atomically in Redis, so every worker on every node shares one bucket.
+# KEYS[1] = bucket, ARGV = capacity, refill rate, tokens requested, allow partial grant, ttl
+RESERVE_SCRIPT = """
+redis.replicate_commands()
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local allow_partial = tonumber(ARGV[4]) == 1
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local granted = 0
+if tokens >= requested then
+    granted = requested
+elseif allow_partial then
+    granted = math.floor(tokens)
+end
+tokens = tokens - granted
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+
+local wait = 0
+if granted < requested and rate > 0 then
+    wait = (requested - granted - tokens) / rate
+end
+return {granted, tostring(tokens), tostring(wait)}
+"""
+
+# Give back tokens that were reserved for messages that were never delivered
+RELEASE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens == nil then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(math.min(capacity, tokens + tonumber(ARGV[2]))))
+return 1
+"""
+
+class RateLimiter:
+    """Redis token bucket allowing `capacity` events per `period` seconds"""
+    
+    def __init__(self, key, capacity, period=3600):
+        self.key = frappe.cache().make_key(f"flashchat_rate_limit:{key}")
+        self.capacity = max(int(capacity), 0)
+        self.period = period
+    
+    @property
+    def rate(self):
+        return self.capacity / float(self.period)
+    
+    def reserve(self, count=1, partial=False):
+        """Atomically take `count` tokens
+        
+        Without `partial` the reservation is all-or-nothing. Returns a tuple of
+        (tokens granted, seconds until the rest would be available).
+        """
+        granted, remaining, wait = self._run(RESERVE_SCRIPT, self.capacity, self.rate,
+            count, 1 if partial else 0, self.period * 2)
+        return int(granted), float(wait)
+    
+    def available(self):
+        """Tokens currently available, without consuming any"""
+        granted, remaining, wait = self._run(RESERVE_SCRIPT, self.capacity, self.rate,
+            0, 0, self.period * 2)
+        return int(float(remaining))
+    
+    def wait_time(self, count=1):
+        """Seconds until `count` tokens will be available"""
+        missing = count - self.available()
+        if missing <= 0:
+            return 0
+        return missing / self.rate if self.rate else float(self.period)
+    
+    def release(self, count):
+        """Return unused tokens to the bucket"""
+        if count > 0:
+            self._run(RELEASE_SCRIPT, self.capacity, count)
+    
+    def reset(self):
+        frappe.cache().delete(self.key)
+    
+    def _run(self, script, *args):
+        return frappe.cache().register_script(script)(keys=[self.key], args=args)
+
+def get_message_limiter(settings, message_type):
+    """Get the hourly limiter for a message type, or None if it is not rate limited"""
+    if message_type == "SMS":
+        limit = settings.sms_rate_limit or 100
+    elif message_type == "WhatsApp":
+        limit = settings.whatsapp_rate_limit or 50
+    elif message_type == "OTP":
+        limit = settings.otp_rate_limit or 20
+    else:
+        return None
+    
+    return RateLimiter(message_type, limit)
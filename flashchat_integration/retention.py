@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import time
+
+import frappe
+from frappe.utils.background_jobs import is_job_enqueued
+
+# Rows deleted per statement, small enough that each delete holds its locks briefly
+DELETE_BATCH_SIZE = 2000
+
+# Pause between batches, so live sends get the locks and replicas keep up
+BATCH_PAUSE_SECONDS = 0.5
+
+# A run stops after this long and queues a job to carry on from where it stopped.
+# Purges run on the long queue, so this stays under its 25 minute timeout.
+MAX_RUN_SECONDS = 20 * 60
+
+def start_purge(doctype, date_field, cutoff):
+    """Run purge_before, unless an earlier purge of `doctype` is still queued or running"""
+    if is_purge_enqueued(doctype):
+        return None
+    return purge_before(doctype, date_field, cutoff)
+
+def purge_before(doctype, date_field, cutoff, batch_size=DELETE_BATCH_SIZE, pause=BATCH_PAUSE_SECONDS, max_seconds=MAX_RUN_SECONDS, run=0):
+    """Delete rows of `doctype` whose `date_field` is before `cutoff`, one batch at a time
+    
+    Each batch reads the oldest expired names through the `date_field` index,
+    deletes them by primary key and commits. Deleted rows are the progress
+    marker, so a run that stops or fails is resumed by running it again with
+    the same cutoff. Runs longer than `max_seconds` queue a continuation job.
+    Returns rows removed, batches and seconds taken, and whether it finished.
+    """
+    started = time.monotonic()
+    deleted = 0
+    batches = 0
+    complete = False
+    
+    while time.monotonic() - started < max_seconds:
+        names = frappe.db.sql_list(f"""
+            select name from `tab{doctype}`
+            where `{date_field}` < %(cutoff)s
+            order by `{date_field}`
+            limit %(limit)s
+        """, {"cutoff": cutoff, "limit": batch_size})
+        
+        if names:
+            frappe.db.sql(f"delete from `tab{doctype}` where name in %(names)s", {"names": tuple(names)})
+            frappe.db.commit()
+            deleted += len(names)
+            batches += 1
+        
+        if len(names) < batch_size:
+            complete = True
+            break
+        
+        time.sleep(pause)
+    
+    summary = {
+        "doctype": doctype,
+        "cutoff": str(cutoff),
+        "deleted": deleted,
+        "batches": batches,
+        "seconds": round(time.monotonic() - started, 1),
+        "complete": complete
+    }
+    frappe.logger("flashchat_integration").info(f"Retention purge: {summary}")
+    
+    if not complete:
+        enqueue_purge(doctype, date_field, cutoff, run + 1, batch_size=batch_size, pause=pause, max_seconds=max_seconds)
+    
+    return summary
+
+def enqueue_purge(doctype, date_field, cutoff, run=0, **kwargs):
+    """Queue purge_before as a long job under the doctype's purge job id
+    
+    Continuations alternate between two job ids, so a running purge can queue
+    the next one without it being taken for a duplicate of itself.
+    """
+    frappe.enqueue(
+        "flashchat_integration.retention.purge_before",
+        queue="long",
+        job_id=get_purge_job_id(doctype, run),
+        deduplicate=True,
+        doctype=doctype,
+        date_field=date_field,
+        cutoff=cutoff,
+        run=run,
+        **kwargs
+    )
+
+def is_purge_enqueued(doctype):
+    return any(is_job_enqueued(get_purge_job_id(doctype, run)) for run in (0, 1))
+
+def get_purge_job_id(doctype, run=0):
+    return f"flashchat_purge:{frappe.scrub(doctype)}:{run % 2}"
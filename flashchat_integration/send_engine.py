@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import frappe
+from frappe.utils import cint, now
+
+DEFAULT_CONCURRENCY = 8
+
+class SendJob:
+    """A single SMS, WhatsApp or OTP send handed to the engine"""
+    
+    __slots__ = ("message_type", "phone", "message", "account", "expire",
+        "reference_doctype", "reference_name")
+    
+    def __init__(self, message_type, phone, message=None, account=None, expire=300,
+            reference_doctype=None, reference_name=None):
+        self.message_type = message_type
+        self.phone = phone
+        self.message = message
+        self.account = account
+        self.expire = expire
+        self.reference_doctype = reference_doctype
+        self.reference_name = reference_name
+
+class FlashChatSendEngine:
+    """Send many messages concurrently from one worker
+    
+    HTTP calls run on a bounded thread pool driven by an asyncio event loop, while
+    building payloads, logging and result handling stay on the calling thread, which
+    owns the database connection. Each job gets the same payload, log row and return
+    value as FlashChatAPI.send_sms / send_whatsapp / send_otp, except that errors are
+    captured in the result instead of raised.
+    """
+    
+    def __init__(self, api=None, concurrency=None):
+        if api is None:
+            from flashchat_integration.api import FlashChatAPI
+            api = FlashChatAPI()
+        
+        self.api = api
+        self.concurrency = (cint(concurrency) or cint(api.settings.get("send_concurrency"))
+            or DEFAULT_CONCURRENCY)
+    
+    def run(self, jobs):
+        """Send all jobs and return one result dict per job, in order"""
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        
+        log_rows = []
+        results = asyncio.run(self._run(jobs, log_rows))
+        
+        self.api._log_messages(log_rows)
+        
+        failed = [r for r in results if not r["success"]]
+        if failed:
+            frappe.log_error(
+                f"{len(failed)}/{len(results)} messages failed. First error: {failed[0]['error']}",
+                "FlashChat Send Engine"
+            )
+        
+        return results
+    
+    async def _run(self, jobs, log_rows):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(jobs))) as executor:
+            return await asyncio.gather(*(
+                self._send(loop, executor, semaphore, job, log_rows) for job in jobs
+            ))
+    
+    async def _send(self, loop, executor, semaphore, job, log_rows):
+        endpoint, payload = self._build_request(job)
+        
+        async with semaphore:
+            try:
+                response = await loop.run_in_executor(
+                    executor,
+                    partial(self.api._make_request, endpoint, data=payload, log_errors=False)
+                )
+                error = None
+            except Exception as e:
+                response = None
+                error = e
+        
+        log_rows.append(self._build_log_row(job, response, error))
+        return self._build_result(job, response, error)
+    
+    def _build_request(self, job):
+        settings = self.api.settings
+        
+        if job.message_type == "SMS":
+            return "send-sms", {
+                "phone": job.phone,
+                "message": job.message,
+                "sim": settings.default_sim or 1,
+                "mode": settings.sms_mode or "devices"
+            }
+        elif job.message_type == "WhatsApp":
+            return "send-whatsapp", {
+                "account": job.account,
+                "recipient": job.phone,
+                "message": job.message
+            }
+        elif job.message_type == "OTP":
+            return "send-otp", {
+                "phone": job.phone,
+                "expire": job.expire
+            }
+        
+        frappe.throw(f"Unsupported message type: {job.message_type}")
+    
+    def _build_log_row(self, job, response, error):
+        row = {
+            "message_type": job.message_type,
+            "phone_number": job.phone,
+            "message_content": job.message,
+            "reference_doctype": job.reference_doctype,
+            "reference_name": job.reference_name,
+            "sent_at": now(),
+            "retry_count": 0
+        }
+        
+        if job.message_type == "OTP":
+            row["message_content"] = f"OTP {'sent' if error is None else 'failed'} with {job.expire}s expiry"
+        
+        if error is None:
+            row.update({
+                "status": "Sent",
+                "flashchat_message_id": response.get("otp_id" if job.message_type == "OTP" else "message_id"),
+                "response_content": json.dumps(response)
+            })
+        else:
+            row.update({"status": "Failed", "error_message": str(error)})
+        
+        return row
+    
+    def _build_result(self, job, response, error):
+        result = {
+            "phone": job.phone,
+            "success": error is None,
+            "error": str(error) if error is not None else None,
+            "reference_doctype": job.reference_doctype,
+            "reference_name": job.reference_name
+        }
+        
+        if error is None:
+            id_field = "otp_id" if job.message_type == "OTP" else "message_id"
+            result[id_field] = response.get(id_field)
+            result["response"] = response
+        
+        return result
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import re
+from collections import ChainMap
+from collections.abc import Mapping
+from functools import lru_cache
+
+import frappe
+from frappe.utils import now
+
+# Same placeholder syntax MessageTemplate validates: {variable}
+PLACEHOLDER_PATTERN = re.compile(r'\{([^}]+)\}')
+
+class CompiledTemplate:
+    """Message content split once into literal and placeholder segments
+    
+    Rendering is a single pass over the segments. Placeholders missing from the
+    context, or whose value is None, are left in the output unchanged.
+    """
+    
+    __slots__ = ("content", "segments", "placeholders")
+    
+    def __init__(self, content):
+        self.content = content or ""
+        self.segments = []
+        
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(self.content):
+            self.segments.append((self.content[position:match.start()], match.group(1)))
+            position = match.end()
+        self.segments.append((self.content[position:], None))
+        
+        self.placeholders = tuple(dict.fromkeys(key for literal, key in self.segments if key is not None))
+    
+    def render(self, context):
+        if not self.placeholders:
+            return self.content
+        
+        parts = []
+        for literal, key in self.segments:
+            parts.append(literal)
+            if key is not None:
+                value = context.get(key)
+                parts.append("{" + key + "}" if value is None else str(value))
+        
+        return "".join(parts)
+    
+    def render_many(self, contexts, defaults=None):
+        """Render once per context, with `defaults` filling keys a context does not set"""
+        if not self.placeholders:
+            return [self.content for context in contexts]
+        
+        rendered = []
+        for context in contexts:
+            if defaults:
+                context = ChainMap(context, defaults)
+            rendered.append(self.render(context))
+        
+        return rendered
+
+class LazyContext(Mapping):
+    """Render context that only computes the values a template looks up
+    
+    Keys in `computed` map to callables, evaluated on first lookup and take
+    precedence over fields of `doc`, which are read from the document as
+    needed instead of being copied up front.
+    """
+    
+    def __init__(self, doc=None, computed=None):
+        self.doc = doc
+        self.computed = computed or {}
+        self._values = {}
+    
+    def __getitem__(self, key):
+        if key in self._values:
+            return self._values[key]
+        
+        if key in self.computed:
+            value = self.computed[key]()
+        elif self.doc is not None and key in self.doc.meta.get_valid_columns():
+            value = self.doc.get(key)
+        else:
+            raise KeyError(key)
+        
+        self._values[key] = value
+        return value
+    
+    def __iter__(self):
+        keys = dict.fromkeys(self.computed)
+        if self.doc is not None:
+            keys.update(dict.fromkeys(self.doc.meta.get_valid_columns()))
+        return iter(keys)
+    
+    def __len__(self):
+        return sum(1 for key in self)
+
+@lru_cache(maxsize=512)
+def compile_template(content):
+    """Get the compiled form of message content, cached per worker by content"""
+    return CompiledTemplate(content)
+
+def request_cached(key, builder):
+    """Compute a context value at most once per request or background job"""
+    values = getattr(frappe.local, "flashchat_context_values", None)
+    if values is None:
+        values = frappe.local.flashchat_context_values = {}
+    
+    if key not in values:
+        values[key] = builder()
+    return values[key]
+
+def get_company_name():
+    """Get the user's default company for messages, once per request"""
+    return request_cached(
+        "company_name",
+        lambda: frappe.defaults.get_user_default("Company") or "Your Company"
+    )
+
+def format_now(formatter, format_string=None):
+    """Format the current date or time with a frappe.utils formatter, once per request"""
+    return request_cached(
+        (formatter.__name__, format_string),
+        lambda: formatter(now(), format_string)
+    )
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import os
+import threading
+import time
+
+import frappe
+import requests
+from frappe.utils import cint, flt
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from flashchat_integration.doctype.flashchat_settings.flashchat_settings import get_settings
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+
+# One transport per worker process, keyed by its pool configuration
+_transports = {}
+_transports_lock = threading.Lock()
+
+class PoolStats:
+    """Thread-safe counters describing connection pool usage"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+            self.wait_time = 0.0
+    
+    def record_checkout(self, wait_time):
+        with self._lock:
+            self.requests += 1
+            self.wait_time += wait_time
+    
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+    
+    def as_dict(self):
+        with self._lock:
+            hits = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "hits": hits,
+                "new_connections": self.new_connections,
+                "hit_rate": round((hits / self.requests) * 100, 2) if self.requests else 0,
+                "wait_time": round(self.wait_time, 6),
+                "average_wait_time": round(self.wait_time / self.requests, 6) if self.requests else 0
+            }
+
+class _InstrumentedPoolMixin:
+    """Record checkout wait time and new connections on a urllib3 pool"""
+    
+    stats = None
+    
+    def _get_conn(self, timeout=None):
+        start = time.monotonic()
+        conn = super()._get_conn(timeout=timeout)
+        if self.stats:
+            self.stats.record_checkout(time.monotonic() - start)
+        return conn
+    
+    def _new_conn(self):
+        if self.stats:
+            self.stats.record_new_connection()
+        return super()._new_conn()
+
+class _InstrumentedHTTPConnectionPool(_InstrumentedPoolMixin, HTTPConnectionPool):
+    pass
+
+class _InstrumentedHTTPSConnectionPool(_InstrumentedPoolMixin, HTTPSConnectionPool):
+    pass
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report into a PoolStats instance"""
+    
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        stats = self.stats
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("HTTPConnectionPool", (_InstrumentedHTTPConnectionPool,), {"stats": stats}),
+            "https": type("HTTPSConnectionPool", (_InstrumentedHTTPSConnectionPool,), {"stats": stats})
+        }
+
+class FlashChatTransport:
+    """Keep-alive HTTP session shared by every FlashChatAPI in a worker process"""
+    
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+            read_timeout=DEFAULT_READ_TIMEOUT):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.stats = PoolStats()
+        self.pid = os.getpid()
+        
+        # Block instead of opening throwaway connections once the pool is exhausted,
+        # so the pool size is a real upper bound on sockets to the FlashChat host
+        adapter = _PooledAdapter(
+            self.stats,
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            pool_block=True
+        )
+        
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def request(self, method, url, **kwargs):
+        """Send a request through the pooled session"""
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+    
+    def close(self):
+        self.session.close()
+    
+    def get_stats(self):
+        stats = self.stats.as_dict()
+        stats.update({
+            "pool_size": self.pool_size,
+            "connect_timeout": self.timeout[0],
+            "read_timeout": self.timeout[1],
+            "pid": self.pid
+        })
+        return stats
+
+def get_transport(settings=None):
+    """Get the pooled transport for this process, configured from FlashChat Settings"""
+    if settings is None:
+        settings = get_settings()
+    
+    key = (
+        cint(settings.get("http_pool_size")) or DEFAULT_POOL_SIZE,
+        flt(settings.get("http_connect_timeout")) or DEFAULT_CONNECT_TIMEOUT,
+        flt(settings.get("http_read_timeout")) or DEFAULT_READ_TIMEOUT
+    )
+    
+    transport = _transports.get(key)
+    if transport and transport.pid == os.getpid():
+        return transport
+    
+    with _transports_lock:
+        # Sockets must never be shared with a forked parent, so drop every
+        # transport inherited across a fork before building a new one
+        for existing_key, existing in list(_transports.items()):
+            if existing.pid != os.getpid():
+                del _transports[existing_key]
+        
+        transport = _transports.get(key)
+        if not transport:
+            transport = FlashChatTransport(*key)
+            _transports[key] = transport
+    
+    return transport
+
+def get_pool_stats():
+    """Get statistics for every transport in this process"""
+    return [transport.get_stats() for transport in _transports.values() if transport.pid == os.getpid()]
+
+def reset_transports():
+    """Close all pooled connections in this process"""
+    with _transports_lock:
+        for transport in _transports.values():
+            if transport.pid == os.getpid():
+                transport.close()
+        _transports.clear()
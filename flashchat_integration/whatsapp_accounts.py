@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+import time
+
+import frappe
+from frappe.utils import cint
+
+from flashchat_integration.doctype.flashchat_settings.flashchat_settings import get_settings
+
+ACCOUNTS_KEY = "flashchat_whatsapp_accounts"
+DEFAULT_CACHE_TTL = 300
+DEFAULT_COOLDOWN = 300
+
+# Consecutive failed sends after which an account is skipped for the cooldown period
+FAILURE_THRESHOLD = 3
+
+def get_accounts(api=None):
+    """Get WhatsApp accounts, calling FlashChat only when nothing is cached
+    
+    Accounts older than the configured TTL are still returned while a background
+    job fetches fresh ones. Cached accounts are dropped after four TTLs.
+    """
+    cached = frappe.cache().get_value(ACCOUNTS_KEY)
+    if not cached:
+        return refresh_accounts(api)
+    
+    if time.time() - cached["fetched_at"] > get_cache_ttl(_get_settings(api)):
+        _schedule_refresh()
+    
+    return cached["accounts"]
+
+def refresh_accounts(api=None):
+    """Fetch WhatsApp accounts from FlashChat and cache them"""
+    if api is None:
+        from flashchat_integration.api import FlashChatAPI
+        api = FlashChatAPI()
+    
+    try:
+        result = api.get_whatsapp_accounts()
+    finally:
+        frappe.cache().delete(_refresh_lock_key())
+    
+    if not result.get("success"):
+        frappe.log_error(f"Failed to fetch WhatsApp accounts: {result.get('error')}", "FlashChat WhatsApp Accounts")
+        return []
+    
+    accounts = result.get("accounts") or []
+    frappe.cache().set_value(
+        ACCOUNTS_KEY,
+        {"accounts": accounts, "fetched_at": time.time()},
+        expires_in_sec=get_cache_ttl(api.settings) * 4
+    )
+    return accounts
+
+def clear_accounts_cache():
+    """Drop cached accounts so the next send fetches them again"""
+    frappe.cache().delete_value(ACCOUNTS_KEY)
+
+def get_account_ids(api=None):
+    """Get ids of accounts that are not cooling down after failures
+    
+    Falls back to every account if all of them are cooling down.
+    """
+    ids = [account["id"] for account in get_accounts(api) if account.get("id")]
+    if len(ids) < 2:
+        return ids
+    
+    down = frappe.cache().mget([_cooldown_key(account) for account in ids])
+    return [account for account, is_down in zip(ids, down) if not is_down] or ids
+
+def select_account(api=None):
+    """Pick the account for the next WhatsApp send, or None if there are no accounts"""
+    accounts = select_accounts(1, api)
+    return accounts[0] if accounts else None
+
+def select_accounts(count, api=None):
+    """Pick accounts for `count` sends, round-robin across healthy accounts
+    
+    The round-robin position is shared in Redis, so concurrent workers spread
+    their sends across accounts too.
+    """
+    ids = get_account_ids(api)
+    if not ids or count <= 0:
+        return []
+    
+    if len(ids) == 1:
+        return ids * count
+    
+    start = frappe.cache().incrby(frappe.cache().make_key("flashchat_whatsapp_account_rr"), count) - count
+    return [ids[(start + i) % len(ids)] for i in range(count)]
+
+def report_sends(account, succeeded=0, failed=0):
+    """Record send outcomes for an account, evicting it after repeated failures"""
+    if not account:
+        return
+    
+    cache = frappe.cache()
+    key = cache.make_key(f"flashchat_whatsapp_account_failures:{account}")
+    
+    if succeeded:
+        cache.delete(key)
+    elif failed:
+        cooldown = cint(_get_settings().get("whatsapp_account_cooldown")) or DEFAULT_COOLDOWN
+        failures = cache.incrby(key, failed)
+        cache.expire(key, cooldown)
+        
+        if failures >= FAILURE_THRESHOLD:
+            cache.set(_cooldown_key(account), 1, ex=cooldown)
+            cache.delete(key)
+
+def get_cache_ttl(settings):
+    return cint(settings.get("whatsapp_account_cache_ttl")) or DEFAULT_CACHE_TTL
+
+def _schedule_refresh():
+    # Only one worker enqueues a refresh while the cached accounts are stale
+    if frappe.cache().set(_refresh_lock_key(), 1, nx=True, ex=60):
+        frappe.enqueue("flashchat_integration.whatsapp_accounts.refresh_accounts", queue="short")
+
+def _get_settings(api=None):
+    return api.settings if api is not None else get_settings()
+
+def _refresh_lock_key():
+    return frappe.cache().make_key("flashchat_whatsapp_accounts_refreshing")
+
+def _cooldown_key(account):
+    return frappe.cache().make_key(f"flashchat_whatsapp_account_down:{account}")
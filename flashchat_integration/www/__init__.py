@@ -1,4 +1,4 @@
-
-# -*- coding: utf-8 -*-
-from __future__ import unicode_literals
-
+
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+